@@ -0,0 +1,54 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.database.connection import engine, Base
+from app.models import models  # noqa: F401  (registers the tables on Base.metadata)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline():
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        partitions = []
+
+        def include_object(object, name, type_, reflected, compare_to):
+            # Partitions, and the copies of foreign keys PostgreSQL keeps per referenced
+            # partition, are part of their parent table rather than schema of their own.
+            # Only autogenerate calls this, inside the migration transaction.
+            if not partitions:
+                partitions.append(set(connection.exec_driver_sql(
+                    "SELECT relname FROM pg_class WHERE relispartition"
+                ).scalars()) if connection.dialect.name == "postgresql" else set())
+            if type_ == "table" and reflected and name in partitions[0]:
+                return False
+            if type_ == "foreign_key_constraint" and reflected and object.referred_table.name in partitions[0]:
+                return False
+            return True
+
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+            include_object=include_object,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
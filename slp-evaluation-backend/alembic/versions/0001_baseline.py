@@ -0,0 +1,81 @@
+"""Baseline schema, as created by init_db.py before migrations were introduced
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+
+Databases created earlier with Base.metadata.create_all should be marked as
+being at this revision (`alembic stamp 0001_baseline`) and then upgraded.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def _id_table(name, *columns):
+    op.create_table(
+        name,
+        sa.Column("id", sa.Integer(), primary_key=True),
+        *columns,
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index(f"ix_{name}_id", name, ["id"])
+
+def upgrade():
+    _id_table(
+        "users",
+        sa.Column("username", sa.String(50), nullable=False, unique=True),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+    )
+    _id_table("categories", sa.Column("name", sa.String(50), nullable=False, unique=True))
+    _id_table("test_types", sa.Column("name", sa.String(20), nullable=False, unique=True))
+    _id_table(
+        "tasks",
+        sa.Column("test_type_id", sa.Integer(), sa.ForeignKey("test_types.id"), nullable=False),
+        sa.Column("item", sa.String(10), nullable=False),
+        sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id"), nullable=False),
+        sa.Column("task_description", sa.Text(), nullable=False),
+    )
+    for name in ("table_a1_lc", "table_a1_oe"):
+        _id_table(
+            name,
+            sa.Column("age_years", sa.Integer(), nullable=False),
+            sa.Column("age_months", sa.Integer(), nullable=False),
+            sa.Column("raw_score", sa.Integer(), nullable=False),
+            sa.Column("standard_score", sa.Integer(), nullable=False),
+            sa.Column("percentile_rank", sa.String(10), nullable=False),
+        )
+    _id_table(
+        "table_a2",
+        sa.Column("sum_standard_scores", sa.Integer(), nullable=False),
+        sa.Column("composite_standard_score", sa.Integer(), nullable=False),
+        sa.Column("composite_percentile_rank", sa.String(10), nullable=False),
+    )
+    _id_table(
+        "evaluations",
+        sa.Column("student_firstname", sa.String(100), nullable=False),
+        sa.Column("student_lastname", sa.String(100), nullable=False),
+        sa.Column("age_years", sa.Integer(), nullable=False),
+        sa.Column("age_months", sa.Integer(), nullable=False),
+        sa.Column("school", sa.String(200), nullable=False),
+        sa.Column("status", sa.Enum("IN_PROGRESS", "COMPLETED", name="statusenum")),
+        sa.Column("completed_at", sa.DateTime()),
+    )
+    _id_table(
+        "evaluation_responses",
+        sa.Column("evaluation_id", sa.Integer(), sa.ForeignKey("evaluations.id"), nullable=False),
+        sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.id"), nullable=False),
+        sa.Column("response", sa.Enum("CORRECT", "INCORRECT", name="responseenum"), nullable=False),
+    )
+
+def downgrade():
+    for name in (
+        "evaluation_responses", "evaluations", "table_a2", "table_a1_oe", "table_a1_lc",
+        "tasks", "test_types", "categories", "users",
+    ):
+        op.drop_table(name)
+    sa.Enum(name="responseenum").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="statusenum").drop(op.get_bind(), checkfirst=True)
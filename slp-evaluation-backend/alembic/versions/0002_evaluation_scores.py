@@ -0,0 +1,33 @@
+"""Stored evaluation scores
+
+Revision ID: 0002_evaluation_scores
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_evaluation_scores"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "evaluation_scores",
+        sa.Column("evaluation_id", sa.Integer(), sa.ForeignKey("evaluations.id"), primary_key=True),
+        sa.Column("listening_raw_score", sa.Integer(), nullable=False),
+        sa.Column("listening_standard_score", sa.Integer()),
+        sa.Column("listening_percentile_rank", sa.String(10)),
+        sa.Column("oral_raw_score", sa.Integer(), nullable=False),
+        sa.Column("oral_standard_score", sa.Integer()),
+        sa.Column("oral_percentile_rank", sa.String(10)),
+        sa.Column("sum_standard_scores", sa.Integer()),
+        sa.Column("composite_standard_score", sa.Integer()),
+        sa.Column("composite_percentile_rank", sa.String(10)),
+        sa.Column("calculated_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+def downgrade():
+    op.drop_table("evaluation_scores")
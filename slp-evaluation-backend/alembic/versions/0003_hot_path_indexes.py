@@ -0,0 +1,66 @@
+"""Composite and unique indexes for scoring, response writes and the dashboard
+
+Revision ID: 0003_hot_path_indexes
+Revises: 0002_evaluation_scores
+Create Date: 2026-10-18
+
+Duplicate rows that would violate the new unique constraints are removed first,
+keeping the most recently inserted row. On PostgreSQL the indexes on the large
+evaluation tables are built CONCURRENTLY so writes are not blocked while they build.
+"""
+from alembic import op
+
+revision = "0003_hot_path_indexes"
+down_revision = "0002_evaluation_scores"
+branch_labels = None
+depends_on = None
+
+# (constraint name, table, columns)
+UNIQUE_CONSTRAINTS = [
+    ("uq_evaluation_responses_evaluation_task", "evaluation_responses", ["evaluation_id", "task_id"]),
+    ("uq_table_a1_lc_age_raw", "table_a1_lc", ["age_years", "age_months", "raw_score"]),
+    ("uq_table_a1_oe_age_raw", "table_a1_oe", ["age_years", "age_months", "raw_score"]),
+    ("uq_table_a2_sum_standard_scores", "table_a2", ["sum_standard_scores"]),
+]
+
+EVALUATION_INDEXES = [
+    ("ix_evaluations_created_at_id", ["created_at", "id"]),
+    ("ix_evaluations_status_created_at_id", ["status", "created_at", "id"]),
+    ("ix_evaluations_school_created_at_id", ["school", "created_at", "id"]),
+]
+
+def _delete_duplicates(table, columns):
+    keys = ", ".join(columns)
+    op.execute(
+        f"DELETE FROM {table} WHERE id NOT IN "
+        f"(SELECT keep_id FROM (SELECT MAX(id) AS keep_id FROM {table} GROUP BY {keys}) AS keep)"
+    )
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == "postgresql"
+
+    for name, table, columns in UNIQUE_CONSTRAINTS:
+        _delete_duplicates(table, columns)
+
+    if postgres:
+        # Build the unique indexes without holding a write lock, then attach them as constraints
+        with op.get_context().autocommit_block():
+            for name, table, columns in UNIQUE_CONSTRAINTS:
+                op.create_index(name, table, columns, unique=True, postgresql_concurrently=True)
+            for name, columns in EVALUATION_INDEXES:
+                op.create_index(name, "evaluations", columns, postgresql_concurrently=True)
+        for name, table, columns in UNIQUE_CONSTRAINTS:
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}")
+    else:
+        for name, table, columns in UNIQUE_CONSTRAINTS:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.create_unique_constraint(name, columns)
+        for name, columns in EVALUATION_INDEXES:
+            op.create_index(name, "evaluations", columns)
+
+def downgrade():
+    for name, columns in EVALUATION_INDEXES:
+        op.drop_index(name, table_name="evaluations")
+    for name, table, columns in UNIQUE_CONSTRAINTS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(name, type_="unique")
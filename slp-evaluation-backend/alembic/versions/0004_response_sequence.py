@@ -0,0 +1,25 @@
+"""Client sequence numbers on evaluation responses
+
+Revision ID: 0004_response_sequence
+Revises: 0003_hot_path_indexes
+Create Date: 2026-10-18
+
+Writes carrying a sequence number at or below the stored one are stale (an older
+click, or a retried duplicate) and are dropped. Existing rows have none, so the
+first sequenced write to each always applies.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_response_sequence"
+down_revision = "0003_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Nullable with no default, so PostgreSQL adds it without rewriting the table
+    op.add_column("evaluation_responses", sa.Column("sequence", sa.BigInteger()))
+
+def downgrade():
+    with op.batch_alter_table("evaluation_responses") as batch_op:
+        batch_op.drop_column("sequence")
@@ -0,0 +1,319 @@
+"""Tenants, and evaluation tables partitioned by tenant
+
+Revision ID: 0005_tenant_partitions
+Revises: 0004_response_sequence
+Create Date: 2026-10-18
+
+Adds a tenants table (a district) with a default tenant that owns every existing
+evaluation and user. evaluations, evaluation_responses and evaluation_scores gain a
+tenant_id that is part of their keys.
+
+On PostgreSQL the three tables are rebuilt as LIST partitioned tables on tenant_id:
+one partition for the default tenant and a DEFAULT partition for tenants that have
+not been given their own (create_tenant.py creates them). Rows are copied across
+inside the migration's transaction, so plan for a write outage proportional to the
+table sizes. Norm tables, tasks and users stay unpartitioned and shared.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005_tenant_partitions"
+down_revision = "0004_response_sequence"
+branch_labels = None
+depends_on = None
+
+DEFAULT_TENANT_ID = 1
+
+# Children before parents, for renaming and dropping
+TABLES = ("evaluation_scores", "evaluation_responses", "evaluations")
+
+COLUMNS = {
+    "evaluations": [
+        "id", "student_firstname", "student_lastname", "age_years", "age_months",
+        "school", "status", "created_at", "completed_at",
+    ],
+    "evaluation_responses": ["id", "evaluation_id", "task_id", "response", "sequence", "created_at"],
+    "evaluation_scores": [
+        "evaluation_id", "listening_raw_score", "listening_standard_score", "listening_percentile_rank",
+        "oral_raw_score", "oral_standard_score", "oral_percentile_rank", "sum_standard_scores",
+        "composite_standard_score", "composite_percentile_rank", "calculated_at", "updated_at",
+    ],
+}
+
+# Names the unnamed foreign keys SQLite reflects, so batch operations can drop them
+SQLITE_NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+# Serial sequences that must outlive the tables being replaced
+SEQUENCES = {"evaluations": "evaluations_id_seq", "evaluation_responses": "evaluation_responses_id_seq"}
+
+OLD_EVALUATION_INDEXES = [
+    ("ix_evaluations_created_at_id", ["created_at", "id"]),
+    ("ix_evaluations_status_created_at_id", ["status", "created_at", "id"]),
+    ("ix_evaluations_school_created_at_id", ["school", "created_at", "id"]),
+]
+EVALUATION_INDEXES = [
+    ("ix_evaluations_tenant_created_at_id", ["tenant_id", "created_at", "id"]),
+    ("ix_evaluations_tenant_status_created_at_id", ["tenant_id", "status", "created_at", "id"]),
+    ("ix_evaluations_tenant_school_created_at_id", ["tenant_id", "school", "created_at", "id"]),
+]
+
+def _tenant_column(table):
+    return sa.Column(
+        "tenant_id", sa.Integer(), sa.ForeignKey("tenants.id", name=f"fk_{table}_tenant_id"),
+        nullable=False, server_default=str(DEFAULT_TENANT_ID)
+    )
+
+
+def _evaluation_columns():
+    return [
+        sa.Column("student_firstname", sa.String(100), nullable=False),
+        sa.Column("student_lastname", sa.String(100), nullable=False),
+        sa.Column("age_years", sa.Integer(), nullable=False),
+        sa.Column("age_months", sa.Integer(), nullable=False),
+        sa.Column("school", sa.String(200), nullable=False),
+        sa.Column("status", postgresql.ENUM(name="statusenum", create_type=False)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("completed_at", sa.DateTime()),
+    ]
+
+def _response_columns():
+    return [
+        sa.Column("evaluation_id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.id", name="evaluation_responses_task_id_fkey"), nullable=False),
+        sa.Column("response", postgresql.ENUM(name="responseenum", create_type=False), nullable=False),
+        sa.Column("sequence", sa.BigInteger()),
+        sa.Column("created_at", sa.DateTime()),
+    ]
+
+def _score_columns():
+    return [
+        sa.Column("listening_raw_score", sa.Integer(), nullable=False),
+        sa.Column("listening_standard_score", sa.Integer()),
+        sa.Column("listening_percentile_rank", sa.String(10)),
+        sa.Column("oral_raw_score", sa.Integer(), nullable=False),
+        sa.Column("oral_standard_score", sa.Integer()),
+        sa.Column("oral_percentile_rank", sa.String(10)),
+        sa.Column("sum_standard_scores", sa.Integer()),
+        sa.Column("composite_standard_score", sa.Integer()),
+        sa.Column("composite_percentile_rank", sa.String(10)),
+        sa.Column("calculated_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    ]
+
+def _serial_id(table):
+    return sa.Column("id", sa.Integer(), nullable=False, server_default=sa.text(f"nextval('{SEQUENCES[table]}')"))
+
+def _rename_with_indexes(old, new):
+    """Rename a table and every index on it, freeing the names for its replacement."""
+    op.rename_table(old, new)
+    bind = op.get_bind()
+    indexes = bind.execute(sa.text(
+        "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE i.indrelid = CAST(:table AS regclass)"
+    ), {"table": new}).scalars().all()
+    for index in indexes:
+        op.execute(f'ALTER INDEX "{index}" RENAME TO "{index[:50]}_old"')
+
+def _copy(table, source, tenant_expression=None):
+    columns = ", ".join(COLUMNS[table])
+    target = f"tenant_id, {columns}" if tenant_expression else columns
+    values = f"{tenant_expression}, {columns}" if tenant_expression else columns
+    op.execute(f"INSERT INTO {table} ({target}) SELECT {values} FROM {source}")
+
+def _take_sequences():
+    # Otherwise dropping the old tables would drop the id sequences with them
+    for table, sequence in SEQUENCES.items():
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+
+def _drop_old_tables():
+    for table in TABLES:
+        op.drop_table(f"{table}_old")
+
+def _upgrade_postgres():
+    for table in TABLES:
+        _rename_with_indexes(table, f"{table}_old")
+
+    partitioned = {"postgresql_partition_by": "LIST (tenant_id)"}
+    op.create_table(
+        "evaluations",
+        _serial_id("evaluations"),
+        *_evaluation_columns(),
+        _tenant_column("evaluations"),
+        # Partition keys must be part of every unique key; (tenant_id, id) is also what children reference
+        sa.PrimaryKeyConstraint("tenant_id", "id", name="evaluations_pkey"),
+        **partitioned
+    )
+    op.create_table(
+        "evaluation_responses",
+        _serial_id("evaluation_responses"),
+        *_response_columns(),
+        _tenant_column("evaluation_responses"),
+        sa.PrimaryKeyConstraint("tenant_id", "id", name="evaluation_responses_pkey"),
+        sa.UniqueConstraint(
+            "tenant_id", "evaluation_id", "task_id", name="uq_evaluation_responses_tenant_evaluation_task"
+        ),
+        **partitioned
+    )
+    op.create_table(
+        "evaluation_scores",
+        sa.Column("evaluation_id", sa.Integer(), nullable=False),
+        *_score_columns(),
+        _tenant_column("evaluation_scores"),
+        sa.PrimaryKeyConstraint("tenant_id", "evaluation_id", name="evaluation_scores_pkey"),
+        **partitioned
+    )
+    for table in reversed(TABLES):
+        op.execute(f"CREATE TABLE {table}_t{DEFAULT_TENANT_ID} PARTITION OF {table} FOR VALUES IN ({DEFAULT_TENANT_ID})")
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    for table in reversed(TABLES):
+        _copy(table, f"{table}_old", str(DEFAULT_TENANT_ID))
+    # Added once the rows are in: one validating scan instead of a check per copied row
+    for table in ("evaluation_responses", "evaluation_scores"):
+        op.create_foreign_key(
+            f"fk_{table}_evaluation", table, "evaluations", ["tenant_id", "evaluation_id"], ["tenant_id", "id"]
+        )
+    _take_sequences()
+    _drop_old_tables()
+
+    # The model's unique keys, which here repeat the primary keys; added separately because
+    # CREATE TABLE folds a unique constraint into a primary key on the same columns
+    op.create_unique_constraint("uq_evaluations_tenant_id", "evaluations", ["tenant_id", "id"])
+    op.create_unique_constraint(
+        "uq_evaluation_scores_tenant_evaluation", "evaluation_scores", ["tenant_id", "evaluation_id"]
+    )
+    # Lookups by id alone (scripts, keyset scans across tenants)
+    op.create_index("ix_evaluations_id", "evaluations", ["id"])
+    op.create_index("ix_evaluation_responses_id", "evaluation_responses", ["id"])
+    for name, columns in EVALUATION_INDEXES:
+        op.create_index(name, "evaluations", columns)
+    for table in TABLES:
+        op.execute(f"ANALYZE {table}")
+
+def _upgrade_sqlite():
+    with op.batch_alter_table("evaluations") as batch_op:
+        batch_op.add_column(_tenant_column("evaluations"))
+        batch_op.create_unique_constraint("uq_evaluations_tenant_id", ["tenant_id", "id"])
+        for name, columns in OLD_EVALUATION_INDEXES:
+            batch_op.drop_index(name)
+        for name, columns in EVALUATION_INDEXES:
+            batch_op.create_index(name, columns)
+    # The old single-column foreign keys are unnamed here; the convention names them so they can go
+    with op.batch_alter_table("evaluation_responses", naming_convention=SQLITE_NAMING) as batch_op:
+        batch_op.drop_constraint("fk_evaluation_responses_evaluation_id_evaluations", type_="foreignkey")
+        batch_op.add_column(_tenant_column("evaluation_responses"))
+        batch_op.drop_constraint("uq_evaluation_responses_evaluation_task", type_="unique")
+        batch_op.create_unique_constraint(
+            "uq_evaluation_responses_tenant_evaluation_task", ["tenant_id", "evaluation_id", "task_id"]
+        )
+        batch_op.create_foreign_key(
+            "fk_evaluation_responses_evaluation", "evaluations", ["tenant_id", "evaluation_id"], ["tenant_id", "id"]
+        )
+    with op.batch_alter_table("evaluation_scores", naming_convention=SQLITE_NAMING) as batch_op:
+        batch_op.drop_constraint("fk_evaluation_scores_evaluation_id_evaluations", type_="foreignkey")
+        batch_op.add_column(_tenant_column("evaluation_scores"))
+        batch_op.create_unique_constraint("uq_evaluation_scores_tenant_evaluation", ["tenant_id", "evaluation_id"])
+        batch_op.create_foreign_key(
+            "fk_evaluation_scores_evaluation", "evaluations", ["tenant_id", "evaluation_id"], ["tenant_id", "id"]
+        )
+
+def upgrade():
+    op.create_table(
+        "tenants",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(200), nullable=False, unique=True),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_tenants_id", "tenants", ["id"])
+    op.execute(f"INSERT INTO tenants (id, name) VALUES ({DEFAULT_TENANT_ID}, 'default')")
+
+    postgres = op.get_bind().dialect.name == "postgresql"
+    if postgres:
+        op.execute("SELECT setval('tenants_id_seq', (SELECT MAX(id) FROM tenants))")
+
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(_tenant_column("users"))
+
+    if postgres:
+        _upgrade_postgres()
+    else:
+        _upgrade_sqlite()
+
+def _downgrade_postgres():
+    for table in TABLES:
+        _rename_with_indexes(table, f"{table}_old")
+
+    op.create_table(
+        "evaluations",
+        _serial_id("evaluations"),
+        *_evaluation_columns(),
+        sa.PrimaryKeyConstraint("id", name="evaluations_pkey"),
+    )
+    op.create_table(
+        "evaluation_responses",
+        _serial_id("evaluation_responses"),
+        sa.Column(
+            "evaluation_id", sa.Integer(),
+            sa.ForeignKey("evaluations.id", name="evaluation_responses_evaluation_id_fkey"), nullable=False
+        ),
+        *_response_columns()[1:],
+        sa.PrimaryKeyConstraint("id", name="evaluation_responses_pkey"),
+        sa.UniqueConstraint("evaluation_id", "task_id", name="uq_evaluation_responses_evaluation_task"),
+    )
+    op.create_table(
+        "evaluation_scores",
+        sa.Column(
+            "evaluation_id", sa.Integer(),
+            sa.ForeignKey("evaluations.id", name="evaluation_scores_evaluation_id_fkey"), primary_key=True
+        ),
+        *_score_columns(),
+    )
+    for table in reversed(TABLES):
+        _copy(table, f"{table}_old")
+    _take_sequences()
+    # Partitions go with their parents
+    _drop_old_tables()
+
+    op.create_index("ix_evaluations_id", "evaluations", ["id"])
+    op.create_index("ix_evaluation_responses_id", "evaluation_responses", ["id"])
+    for name, columns in OLD_EVALUATION_INDEXES:
+        op.create_index(name, "evaluations", columns)
+
+def _downgrade_sqlite():
+    with op.batch_alter_table("evaluation_scores") as batch_op:
+        batch_op.drop_constraint("fk_evaluation_scores_evaluation", type_="foreignkey")
+        batch_op.drop_constraint("uq_evaluation_scores_tenant_evaluation", type_="unique")
+        batch_op.drop_constraint("fk_evaluation_scores_tenant_id", type_="foreignkey")
+        batch_op.drop_column("tenant_id")
+        batch_op.create_foreign_key(
+            "fk_evaluation_scores_evaluation_id_evaluations", "evaluations", ["evaluation_id"], ["id"]
+        )
+    with op.batch_alter_table("evaluation_responses") as batch_op:
+        batch_op.drop_constraint("fk_evaluation_responses_evaluation", type_="foreignkey")
+        batch_op.drop_constraint("fk_evaluation_responses_tenant_id", type_="foreignkey")
+        batch_op.drop_constraint("uq_evaluation_responses_tenant_evaluation_task", type_="unique")
+        batch_op.create_unique_constraint("uq_evaluation_responses_evaluation_task", ["evaluation_id", "task_id"])
+        batch_op.drop_column("tenant_id")
+        batch_op.create_foreign_key(
+            "fk_evaluation_responses_evaluation_id_evaluations", "evaluations", ["evaluation_id"], ["id"]
+        )
+    with op.batch_alter_table("evaluations") as batch_op:
+        for name, columns in EVALUATION_INDEXES:
+            batch_op.drop_index(name)
+        batch_op.drop_constraint("uq_evaluations_tenant_id", type_="unique")
+        batch_op.drop_constraint("fk_evaluations_tenant_id", type_="foreignkey")
+        batch_op.drop_column("tenant_id")
+        for name, columns in OLD_EVALUATION_INDEXES:
+            batch_op.create_index(name, columns)
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        _downgrade_postgres()
+    else:
+        _downgrade_sqlite()
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_constraint("fk_users_tenant_id", type_="foreignkey")
+        batch_op.drop_column("tenant_id")
+    op.drop_index("ix_tenants_id", table_name="tenants")
+    op.drop_table("tenants")
@@ -0,0 +1,28 @@
+"""Revoked tokens shared across workers
+
+Revision ID: 0006_revoked_tokens
+Revises: 0005_tenant_partitions
+Create Date: 2026-10-18
+
+Logout used to revoke a token only in the worker that served it. Revocations now
+live here, keyed by the token's SHA-256, until the token's own expiry.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_revoked_tokens"
+down_revision = "0005_tenant_partitions"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("token_hash", sa.String(64), primary_key=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_revoked_tokens_expires_at", "revoked_tokens", ["expires_at"])
+
+def downgrade():
+    op.drop_index("ix_revoked_tokens_expires_at", table_name="revoked_tokens")
+    op.drop_table("revoked_tokens")
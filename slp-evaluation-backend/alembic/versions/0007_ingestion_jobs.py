@@ -0,0 +1,41 @@
+"""Ingestion jobs in the database
+
+Revision ID: 0007_ingestion_jobs
+Revises: 0006_revoked_tokens
+Create Date: 2026-10-18
+
+OCR ingestion jobs used to live in the memory of the worker that accepted them, so
+status polls served by another worker returned 404 and a restart lost every job.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_ingestion_jobs"
+down_revision = "0006_revoked_tokens"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "ingestion_jobs",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("tenant_id", sa.Integer(), nullable=False),
+        sa.Column("evaluation_id", sa.Integer(), nullable=False),
+        sa.Column("sheets", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("processed", sa.Integer(), nullable=False),
+        sa.Column("saved", sa.Integer(), nullable=False),
+        sa.Column("unresolved", sa.JSON(), nullable=False),
+        sa.Column("errors", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime()),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], name="fk_ingestion_jobs_tenant_id"),
+        sa.ForeignKeyConstraint(
+            ["tenant_id", "evaluation_id"], ["evaluations.tenant_id", "evaluations.id"],
+            name="fk_ingestion_jobs_evaluation"
+        ),
+    )
+
+def downgrade():
+    op.drop_table("ingestion_jobs")
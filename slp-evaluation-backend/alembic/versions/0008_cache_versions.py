@@ -0,0 +1,28 @@
+"""Cache versions shared across workers
+
+Revision ID: 0008_cache_versions
+Revises: 0007_ingestion_jobs
+Create Date: 2026-10-18
+
+A catalog or norm reload used to refresh only the worker that served it. Each cache now
+has a version here; reloads and imports bump it, and every worker reloads once it sees
+the change.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_cache_versions"
+down_revision = "0007_ingestion_jobs"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    cache_versions = op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+    )
+    op.bulk_insert(cache_versions, [{"name": "catalog", "version": 0}, {"name": "norms", "version": 0}])
+
+def downgrade():
+    op.drop_table("cache_versions")
@@ -0,0 +1,32 @@
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.database.connection import engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class UnmanagedDatabase(Exception):
+    """Raised when a database has tables but no Alembic history to upgrade from."""
+
+def alembic_config() -> Config:
+    # No ini file: alembic.ini's logging setup would silence the caller's loggers
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+def upgrade_to_head():
+    """
+    Bring DATABASE_URL to the current schema through the migrations, as deployments do.
+    create_all would skip what only the migrations build: the tenant partitions on
+    PostgreSQL, the default tenant and its sequence position.
+    """
+    tables = set(inspect(engine).get_table_names())
+    if tables and "alembic_version" not in tables:
+        raise UnmanagedDatabase(
+            "The database has tables but no alembic_version (it was built with create_all). "
+            "Recreate it, or `alembic stamp` the revision it matches, then run this again."
+        )
+    command.upgrade(alembic_config(), "head")
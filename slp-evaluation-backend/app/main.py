@@ -1,9 +1,70 @@
-from fastapi import FastAPI
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from brotli_asgi import BrotliMiddleware
 
-from app.routers import auth, evaluation
+from app.database.connection import engine, async_engine, AsyncSessionLocal
+from app.responses import ORJSONResponse
+from app.routers import auth, evaluation, analytics
+from app.services.auth_service import get_current_user
+from app.services.calculation_service import get_norm_index
+from app.services.catalog_service import get_task_catalog
+from app.services.events_service import broker
+from app.services.metrics_service import InstrumentationMiddleware, instrument_engine, render_metrics
+from app.services.ocr_service import shutdown_ocr_pool
+from app.services.response_buffer_service import response_buffer
+from app.services.tenant_service import tenant_router
 
-app = FastAPI(title="SLP Evaluation System", version="1.0.0")
+logger = logging.getLogger(__name__)
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+# Load the norm and catalog caches before serving instead of on the first request
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() in ("1", "true", "yes")
+
+async def warm_up():
+    """Open the first pooled connection and load the process-wide caches."""
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(get_norm_index)
+            await db.run_sync(get_task_catalog)
+    except Exception as e:
+        # Not fatal: the caches load on first use once the database is reachable
+        logger.warning("Startup warm-up failed: %s", e)
+        return
+    logger.info("Startup warm-up done in %.0fms", (time.perf_counter() - started) * 1000)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if STARTUP_WARMUP:
+        await warm_up()
+    yield
+    await response_buffer.drain()
+    await broker.close()
+    shutdown_ocr_pool()
+    await tenant_router.dispose()
+    await async_engine.dispose()
+    engine.dispose()
+
+app = FastAPI(
+    title="SLP Evaluation System", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan
+)
+
+# Brotli when the client accepts it, gzip otherwise; added first so request timing includes compression
+# Event streams are excluded: compressors buffer, which would hold events back
+app.add_middleware(
+    BrotliMiddleware, minimum_size=COMPRESSION_MIN_BYTES, gzip_fallback=True, excluded_handlers=[r"/events$"]
+)
+
+instrument_engine(engine)
+instrument_engine(async_engine)
+tenant_router.on_engine_created(lambda tenant_id, tenant_engine: instrument_engine(tenant_engine, f"tenant-{tenant_id}"))
+app.add_middleware(InstrumentationMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,11 +72,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count", "X-Profile-File"],
 )
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
-app.include_router(evaluation.router, prefix="/api/evaluation", tags=["evaluation"])
+app.include_router(
+    evaluation.router,
+    prefix="/api/evaluation",
+    tags=["evaluation"],
+    dependencies=[Depends(get_current_user)]
+)
+app.include_router(
+    analytics.router,
+    prefix="/api/analytics",
+    tags=["analytics"],
+    dependencies=[Depends(get_current_user)]
+)
 
 @app.get("/")
 async def root():
@@ -25,6 +98,11 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request latency, SQL statement and DB time metrics in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
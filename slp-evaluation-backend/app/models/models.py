@@ -1,7 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, BigInteger, Integer, String, DateTime, Text, JSON, ForeignKey, ForeignKeyConstraint, Enum, UniqueConstraint,
+    Index
+)
+from sqlalchemy.orm import declared_attr, relationship
 from sqlalchemy.sql import func
 from app.database.connection import Base
+from datetime import datetime
 import enum
 
 class TestTypeEnum(enum.Enum):
@@ -16,14 +20,51 @@ class StatusEnum(enum.Enum):
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
 
+# Tenant that owns everything created before tenants existed, and users without one
+DEFAULT_TENANT_ID = 1
+
+class Tenant(Base):
+    """A district; its evaluations live in their own partitions on PostgreSQL."""
+    __tablename__ = "tenants"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(200), unique=True, nullable=False)
+    created_at = Column(DateTime, default=func.now())
+
+class TenantScoped:
+    """
+    Rows owned by one tenant. On PostgreSQL these tables are list-partitioned by tenant_id,
+    so tenant_id is part of their keys; the ORM still identifies rows by id alone,
+    which stays unique across tenants.
+    """
+    
+    @declared_attr
+    def tenant_id(cls):
+        return Column(Integer, ForeignKey("tenants.id"), nullable=False, default=DEFAULT_TENANT_ID)
+
 class User(Base):
     __tablename__ = "users"
     
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, default=DEFAULT_TENANT_ID)
     created_at = Column(DateTime, default=func.now())
 
+class RevokedToken(Base):
+    """Logged-out tokens, shared by every worker until the token would have expired anyway."""
+    __tablename__ = "revoked_tokens"
+    
+    token_hash = Column(String(64), primary_key=True)  # SHA-256 of the token, never the token itself
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class CacheVersion(Base):
+    """Bumped when the data behind a process-wide cache changes, so every worker reloads it."""
+    __tablename__ = "cache_versions"
+    
+    name = Column(String(50), primary_key=True)  # "catalog" or "norms"
+    version = Column(Integer, nullable=False, default=0)
+
 class Category(Base):
     __tablename__ = "categories"
     
@@ -53,6 +94,9 @@ class Task(Base):
 
 class TableA1LC(Base):
     __tablename__ = "table_a1_lc"
+    __table_args__ = (
+        UniqueConstraint("age_years", "age_months", "raw_score", name="uq_table_a1_lc_age_raw"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     age_years = Column(Integer, nullable=False)
@@ -64,6 +108,9 @@ class TableA1LC(Base):
 
 class TableA1OE(Base):
     __tablename__ = "table_a1_oe"
+    __table_args__ = (
+        UniqueConstraint("age_years", "age_months", "raw_score", name="uq_table_a1_oe_age_raw"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     age_years = Column(Integer, nullable=False)
@@ -75,6 +122,9 @@ class TableA1OE(Base):
 
 class TableA2(Base):
     __tablename__ = "table_a2"
+    __table_args__ = (
+        UniqueConstraint("sum_standard_scores", name="uq_table_a2_sum_standard_scores"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     sum_standard_scores = Column(Integer, nullable=False)
@@ -82,8 +132,16 @@ class TableA2(Base):
     composite_percentile_rank = Column(String(10), nullable=False)
     created_at = Column(DateTime, default=func.now())
 
-class Evaluation(Base):
+class Evaluation(TenantScoped, Base):
     __tablename__ = "evaluations"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "id", name="uq_evaluations_tenant_id"),
+        # Keyset pagination for the dashboard, optionally narrowed by status or school; tenant
+        # first, since tenants without a partition of their own share the default one
+        Index("ix_evaluations_tenant_created_at_id", "tenant_id", "created_at", "id"),
+        Index("ix_evaluations_tenant_status_created_at_id", "tenant_id", "status", "created_at", "id"),
+        Index("ix_evaluations_tenant_school_created_at_id", "tenant_id", "school", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_firstname = Column(String(100), nullable=False)
@@ -96,15 +154,67 @@ class Evaluation(Base):
     completed_at = Column(DateTime)
     
     responses = relationship("EvaluationResponse", back_populates="evaluation")
+    scores = relationship("EvaluationScore", back_populates="evaluation", uselist=False)
 
-class EvaluationResponse(Base):
+class EvaluationResponse(TenantScoped, Base):
     __tablename__ = "evaluation_responses"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "evaluation_id", "task_id", name="uq_evaluation_responses_tenant_evaluation_task"),
+        ForeignKeyConstraint(["tenant_id", "evaluation_id"], ["evaluations.tenant_id", "evaluations.id"]),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    evaluation_id = Column(Integer, ForeignKey("evaluations.id"), nullable=False)
+    evaluation_id = Column(Integer, nullable=False)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
     response = Column(Enum(ResponseEnum), nullable=False)
+    # Client-assigned, increasing per click; older or repeated writes are ignored
+    sequence = Column(BigInteger)
     created_at = Column(DateTime, default=func.now())
     
     evaluation = relationship("Evaluation", back_populates="responses")
-    task = relationship("Task")
\ No newline at end of file
+    task = relationship("Task")
+
+class EvaluationScore(TenantScoped, Base):
+    __tablename__ = "evaluation_scores"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "evaluation_id", name="uq_evaluation_scores_tenant_evaluation"),
+        ForeignKeyConstraint(["tenant_id", "evaluation_id"], ["evaluations.tenant_id", "evaluations.id"]),
+    )
+    
+    evaluation_id = Column(Integer, primary_key=True)
+    listening_raw_score = Column(Integer, nullable=False, default=0)
+    listening_standard_score = Column(Integer)
+    listening_percentile_rank = Column(String(10))
+    oral_raw_score = Column(Integer, nullable=False, default=0)
+    oral_standard_score = Column(Integer)
+    oral_percentile_rank = Column(String(10))
+    sum_standard_scores = Column(Integer)
+    composite_standard_score = Column(Integer)
+    composite_percentile_rank = Column(String(10))
+    calculated_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    evaluation = relationship("Evaluation", back_populates="scores")
+
+class IngestionJob(TenantScoped, Base):
+    """
+    A score sheet OCR run, kept in the database so any worker can report on it and it
+    survives a restart. A queued or running job that stops updating was interrupted.
+    """
+    __tablename__ = "ingestion_jobs"
+    __table_args__ = (
+        ForeignKeyConstraint(["tenant_id", "evaluation_id"], ["evaluations.tenant_id", "evaluations.id"]),
+    )
+    
+    id = Column(String(32), primary_key=True)
+    evaluation_id = Column(Integer, nullable=False)
+    sheets = Column(JSON, nullable=False)  # [[file_path, test_type], ...]
+    status = Column(String(20), nullable=False, default="queued")
+    processed = Column(Integer, nullable=False, default=0)
+    saved = Column(Integer, nullable=False, default=0)
+    unresolved = Column(JSON, nullable=False, default=dict)
+    errors = Column(JSON, nullable=False, default=dict)
+    # Set in Python rather than by the database so they are loaded without a refresh
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime)
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+import asyncio
+
+from app.models.models import Category, Evaluation, EvaluationResponse, ResponseEnum, StatusEnum, Task, TestType
+from app.services.calculation_service import get_norm_index
+from app.services.catalog_service import get_task_catalog
+from app.routers.evaluation import evaluation_filters
+from app.services.tenant_service import get_tenant_db
+
+router = APIRouter()
+
+@router.get("/cohort")
+async def get_cohort_analytics(
+    school: Optional[List[str]] = Query(None),
+    status: Optional[StatusEnum] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    age_years_min: Optional[int] = None,
+    age_years_max: Optional[int] = None,
+    db: AsyncSession = Depends(get_tenant_db)
+):
+    """
+    Score distributions per school, age band and category, plus item pass rates,
+    for every evaluation of the tenant matching the filters (all statuses unless status is given).
+    """
+    filters = evaluation_filters(status, school, date_from, date_to, age_years_min, age_years_max)
+    
+    catalog = await db.run_sync(get_task_catalog)
+    norms = await db.run_sync(get_norm_index)
+    categories = sorted({task["category"] for task in catalog.oral_tasks + catalog.listening_tasks})
+    test_type_ids = dict((await db.execute(select(TestType.name, TestType.id))).all())
+    category_ids = dict((await db.execute(select(Category.name, Category.id))).all())
+    
+    # Pre-aggregated in the database: one row per evaluation, with correct answers per test and
+    # attempted/correct per category. The outer join keeps evaluations without any responses.
+    is_correct = EvaluationResponse.response == ResponseEnum.CORRECT
+    counts = [
+        func.count(case((and_(Task.test_type_id == test_type_ids.get(name), is_correct), 1)))
+        for name in ("listening", "oral")
+    ]
+    for name in categories:
+        in_category = Task.category_id == category_ids[name]
+        counts.append(func.count(case((in_category, 1))))
+        counts.append(func.count(case((and_(in_category, is_correct), 1))))
+    same_evaluation = and_(
+        EvaluationResponse.tenant_id == Evaluation.tenant_id, EvaluationResponse.evaluation_id == Evaluation.id
+    )
+    evaluations = (await db.execute(
+        select(Evaluation.id, Evaluation.school, Evaluation.age_years, Evaluation.age_months, *counts)
+        .select_from(Evaluation)
+        .outerjoin(EvaluationResponse, same_evaluation)
+        .outerjoin(Task, Task.id == EvaluationResponse.task_id)
+        .where(*filters)
+        .group_by(Evaluation.id, Evaluation.school, Evaluation.age_years, Evaluation.age_months)
+    )).all()
+    
+    # Attempts and correct answers per item across the cohort
+    items = (await db.execute(
+        select(EvaluationResponse.task_id, func.count(), func.count(case((is_correct, 1))))
+        .join(Evaluation, same_evaluation)
+        .where(*filters)
+        .group_by(EvaluationResponse.task_id)
+    )).all()
+    
+    # Imported here so NumPy only loads in workers that actually serve analytics
+    from app.services.analytics_service import summarize_cohort
+    return await asyncio.to_thread(summarize_cohort, evaluations, items, categories, catalog, norms)
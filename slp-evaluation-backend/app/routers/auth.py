@@ -1,11 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from datetime import timedelta
 
-from app.database.connection import get_db
+from app.database.connection import get_async_db
 from app.models.models import User
-from app.services.auth_service import verify_password, create_access_token
+from app.services.auth_service import (
+    verify_password_async, create_access_token, decode_access_token, PasswordHasherBusy,
+    bearer_scheme, get_current_user, revoke_token, token_cache
+)
 
 router = APIRouter()
 
@@ -18,18 +24,54 @@ class LoginResponse(BaseModel):
     token_type: str
 
 @router.post("/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == login_data.username).first()
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(User).where(User.username == login_data.username))
+    user = result.scalars().first()
     
-    if not user or not verify_password(login_data.password, user.password_hash):
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
     
+    try:
+        valid, new_hash = await verify_password_async(login_data.password, user.password_hash)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts in progress, please retry",
+            headers={"Retry-After": "1"}
+        )
+    
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password"
+        )
+    
+    # Upgrade hashes created with an older work factor
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+        token_cache.invalidate_user(user.username)
+    
     access_token = create_access_token(
         data={"sub": user.username},
         expires_delta=timedelta(minutes=30)
     )
     
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/logout")
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Revoke the current token for every worker."""
+    try:
+        claims = decode_access_token(credentials.credentials)
+    except JWTError:
+        claims = None
+    await revoke_token(db, credentials.credentials, claims)
+    return {"message": "Logged out"}
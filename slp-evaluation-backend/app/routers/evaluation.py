@@ -1,12 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from typing import List, Literal, Optional, Union
+from datetime import datetime, date, timedelta
+import asyncio
+import base64
+import hashlib
+from pathlib import Path
 
-from app.database.connection import get_db
-from app.models.models import Evaluation, EvaluationResponse, Task, TestType, Category, ResponseEnum, StatusEnum
-from app.services.calculation_service import calculate_scores_for_evaluation
+from app.database.connection import get_async_db
+from app.models.models import Evaluation, EvaluationResponse, EvaluationScore, ResponseEnum, StatusEnum, TestTypeEnum
+from app.services.calculation_service import (
+    calculate_scores_for_evaluation, save_evaluation_scores, reload_norm_index, SCORE_COLUMNS
+)
+from app.services.response_buffer_service import response_buffer
+from app.services.response_service import ResponseTargetNotFound
+from app.services.catalog_service import get_task_catalog, reload_task_catalog, etag_matches
+from app.services.export_service import export_stream, EXPORT_MEDIA_TYPES
+from app.services.events_service import broker, publish_event, uses_notify, format_sse, EVENTS_HEARTBEAT_SECONDS
+from app.services.file_service import (
+    save_upload_stream, cleanup_stale_uploads, touch_upload, UploadRejected, UPLOAD_DIR, UPLOAD_MAX_BYTES
+)
+from app.services.ocr_service import (
+    create_ingestion_job, describe_ingestion_job, get_ingestion_job, run_ingestion_job
+)
+from app.services.tenant_service import get_tenant_db, get_tenant_id, tenant_router, tenant_session
 
 router = APIRouter()
 
@@ -23,26 +44,158 @@ class EvaluationCreate(BaseModel):
 class ResponseUpdate(BaseModel):
     task_id: int
     response: str  # 'correct' or 'incorrect'
+    sequence: Optional[int] = None  # increasing per click; stale or repeated writes are dropped
 
-@router.get("/dashboard")
-async def get_evaluations(db: Session = Depends(get_db)):
-    """Get all evaluations for dashboard."""
-    evaluations = db.query(Evaluation).order_by(Evaluation.created_at.desc()).all()
+class ResponseBatch(BaseModel):
+    responses: List[ResponseUpdate]
+
+class DashboardEvaluation(BaseModel):
+    id: int
+    student_name: str
+    school: str
+    date: str
+    status: str
+
+class EvaluationHeader(BaseModel):
+    id: int
+    student_name: str
+    age: str
+    school: str
+    status: str
+
+class TestTask(BaseModel):
+    id: int
+    item: str
+    category: str
+    task_description: str
+    response: str  # 'correct', 'incorrect' or '' when not answered yet
+
+class EvaluationTest(BaseModel):
+    evaluation: EvaluationHeader
+    catalog_version: str
+    oral_tasks: List[TestTask]
+    listening_tasks: List[TestTask]
+
+class IngestSheet(BaseModel):
+    file_path: str  # as returned by the upload endpoint
+    test_type: TestTypeEnum
+
+class IngestRequest(BaseModel):
+    sheets: List[IngestSheet]
+
+def parse_response_value(value: str) -> ResponseEnum:
+    if value not in ["correct", "incorrect"]:
+        raise HTTPException(status_code=400, detail="Response must be 'correct' or 'incorrect'")
+    return ResponseEnum.CORRECT if value == "correct" else ResponseEnum.INCORRECT
+
+def encode_cursor(created_at: datetime, evaluation_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{evaluation_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, evaluation_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(evaluation_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def evaluation_filters(status: Optional[StatusEnum], school: Union[str, List[str], None], date_from: Optional[date], date_to: Optional[date],
+                       age_years_min: Optional[int] = None, age_years_max: Optional[int] = None) -> list:
+    """Conditions on Evaluation for the filters that were given; school may be one name or several."""
+    filters = []
+    if status:
+        filters.append(Evaluation.status == status)
+    if isinstance(school, list):
+        filters.append(Evaluation.school.in_(school))
+    elif school:
+        filters.append(Evaluation.school == school)
+    if date_from:
+        filters.append(Evaluation.created_at >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        filters.append(Evaluation.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    if age_years_min is not None:
+        filters.append(Evaluation.age_years >= age_years_min)
+    if age_years_max is not None:
+        filters.append(Evaluation.age_years <= age_years_max)
+    return filters
+
+@router.get("/dashboard", response_model=List[DashboardEvaluation])
+async def get_evaluations(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    status: Optional[StatusEnum] = None,
+    school: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_tenant_db)
+):
+    """
+    Get a page of evaluations for dashboard, newest first.
+    The next page's cursor is returned in the X-Next-Cursor header.
+    """
+    filters = evaluation_filters(status, school, date_from, date_to)
+    
+    query = select(
+        Evaluation.id,
+        Evaluation.student_firstname,
+        Evaluation.student_lastname,
+        Evaluation.school,
+        Evaluation.created_at,
+        Evaluation.status
+    ).where(*filters)
+    
+    if cursor:
+        query = query.where(tuple_(Evaluation.created_at, Evaluation.id) < decode_cursor(cursor))
+    
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(query.order_by(Evaluation.created_at.desc(), Evaluation.id.desc()).limit(limit + 1))
+    rows = result.all()
+    page = rows[:limit]
+    
+    if len(rows) > limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(page[-1].created_at, page[-1].id)
+    if include_total:
+        total = await db.scalar(select(func.count(Evaluation.id)).where(*filters))
+        response.headers["X-Total-Count"] = str(total)
     
     return [
         {
-            "id": eval.id,
-            "student_name": f"{eval.student_firstname} {eval.student_lastname}",
-            "school": eval.school,
-            "date": eval.created_at.strftime("%Y-%m-%d"),
-            "status": eval.status.value
+            "id": row.id,
+            "student_name": f"{row.student_firstname} {row.student_lastname}",
+            "school": row.school,
+            "date": row.created_at.strftime("%Y-%m-%d"),
+            "status": row.status.value
         }
-        for eval in evaluations
+        for row in page
     ]
 
+@router.get("/export")
+async def export_evaluations(
+    dataset: Literal["evaluations", "responses"] = "evaluations",
+    format: Literal["csv", "ndjson"] = "csv",
+    status: Optional[StatusEnum] = None,
+    school: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    tenant_id: int = Depends(get_tenant_id)
+):
+    """
+    Stream every matching evaluation (with stored scores) or response as CSV or NDJSON.
+    Rows are written as they come off the database cursor, so memory stays flat.
+    """
+    filters = evaluation_filters(status, school, date_from, date_to)
+    filename = f"{dataset}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{format}"
+    return StreamingResponse(
+        export_stream(tenant_id, dataset, format, filters),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.post("/create")
-async def create_evaluation(eval_data: EvaluationCreate, db: Session = Depends(get_db)):
-    """Create new evaluation."""
+async def create_evaluation(eval_data: EvaluationCreate, db: AsyncSession = Depends(get_tenant_db)):
+    """Create new evaluation for the current user's tenant."""
     evaluation = Evaluation(
         student_firstname=eval_data.student_info.firstname,
         student_lastname=eval_data.student_info.lastname,
@@ -52,46 +205,64 @@ async def create_evaluation(eval_data: EvaluationCreate, db: Session = Depends(g
     )
     
     db.add(evaluation)
-    db.commit()
-    db.refresh(evaluation)
+    await db.commit()
+    await db.refresh(evaluation)
     
     return {"evaluation_id": evaluation.id, "message": "Evaluation created successfully"}
 
-@router.get("/test/{evaluation_id}")
-async def get_evaluation_test(evaluation_id: int, db: Session = Depends(get_db)):
+@router.get("/catalog")
+async def get_catalog(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Get the grouped task catalog; supports If-None-Match revalidation."""
+    catalog = await db.run_sync(get_task_catalog)
+    etag = f'"{catalog.version}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
+    return catalog.as_dict()
+
+@router.post("/catalog/reload")
+async def reload_catalog(db: AsyncSession = Depends(get_async_db)):
+    """Reload the cached task catalog after tasks change outside init_db.py; every worker follows."""
+    catalog = await db.run_sync(reload_task_catalog)
+    await db.commit()
+    return {"message": "Task catalog reloaded", "version": catalog.version}
+
+@router.get("/test/{evaluation_id}", response_model=EvaluationTest)
+async def get_evaluation_test(evaluation_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_tenant_db)):
     """Get evaluation details and tasks for testing interface."""
-    evaluation = db.query(Evaluation).filter(Evaluation.id == evaluation_id).first()
-    if not evaluation:
-        raise HTTPException(status_code=404, detail="Evaluation not found")
+    catalog = await db.run_sync(get_task_catalog)
     
-    # Get all tasks with joined test_type and category data
-    tasks = db.query(Task).join(TestType).join(Category).order_by(TestType.name, Task.item).all()
+    # Evaluation header and its responses in one query; the catalog comes from the cache
+    result = await db.execute(select(
+        Evaluation.id,
+        Evaluation.student_firstname,
+        Evaluation.student_lastname,
+        Evaluation.age_years,
+        Evaluation.age_months,
+        Evaluation.school,
+        Evaluation.status,
+        EvaluationResponse.task_id,
+        EvaluationResponse.response
+    ).outerjoin(
+        EvaluationResponse, EvaluationResponse.evaluation_id == Evaluation.id
+    ).where(Evaluation.id == evaluation_id))
+    rows = result.all()
+    
+    if not rows:
+        raise HTTPException(status_code=404, detail="Evaluation not found")
     
-    # Get existing responses
-    responses = db.query(EvaluationResponse).filter(
-        EvaluationResponse.evaluation_id == evaluation_id
-    ).all()
+    evaluation = rows[0]
     
     # Create response lookup
-    response_lookup = {resp.task_id: resp.response.value for resp in responses}
-    
-    # Group tasks by test type
-    oral_tasks = []
-    listening_tasks = []
-    
-    for task in tasks:
-        task_data = {
-            "id": task.id,
-            "item": task.item,
-            "category": task.category.name,
-            "task_description": task.task_description,
-            "response": response_lookup.get(task.id, "")
-        }
-        
-        if task.test_type.name == "oral":
-            oral_tasks.append(task_data)
-        else:
-            listening_tasks.append(task_data)
+    response_lookup = {row.task_id: row.response.value for row in rows if row.task_id is not None}
+    
+    # The ETag covers the catalog version plus this evaluation's header and responses
+    overlay = repr((tuple(evaluation[:7]), sorted(response_lookup.items()))).encode("utf-8")
+    etag = f'"{catalog.version}-{hashlib.sha1(overlay).hexdigest()[:16]}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     
     return {
         "evaluation": {
@@ -101,75 +272,258 @@ async def get_evaluation_test(evaluation_id: int, db: Session = Depends(get_db))
             "school": evaluation.school,
             "status": evaluation.status.value
         },
-        "oral_tasks": oral_tasks,
-        "listening_tasks": listening_tasks
+        "catalog_version": catalog.version,
+        **catalog.with_responses(response_lookup)
+    }
+
+async def load_event_snapshot(db: AsyncSession, evaluation_id: int) -> dict:
+    """Current status, responses and raw-score totals, sent when an event stream opens."""
+    catalog = await db.run_sync(get_task_catalog)
+    result = await db.execute(select(
+        Evaluation.status, EvaluationResponse.task_id, EvaluationResponse.response
+    ).outerjoin(
+        EvaluationResponse, EvaluationResponse.evaluation_id == Evaluation.id
+    ).where(Evaluation.id == evaluation_id))
+    rows = result.all()
+    
+    responses = {row.task_id: row.response for row in rows if row.task_id is not None}
+    totals = {"listening_raw_score": 0, "oral_raw_score": 0}
+    for task_id, response in responses.items():
+        test_type = catalog.task_test_types.get(task_id)
+        if test_type and response == ResponseEnum.CORRECT:
+            totals[f"{test_type}_raw_score"] += 1
+    
+    return {
+        "type": "snapshot",
+        "evaluation_id": evaluation_id,
+        "status": rows[0].status.value,
+        "catalog_version": catalog.version,
+        "responses": {str(task_id): response.value for task_id, response in responses.items()},
+        "totals": totals
     }
 
+async def evaluation_event_stream(tenant_id: int, evaluation_id: int, request: Request, listen: bool):
+    queue = broker.subscribe(tenant_id, evaluation_id)
+    try:
+        if listen:
+            await broker.ensure_listener(tenant_router.engine_for(tenant_id))
+        # Snapshot after subscribing, so every later change arrives as an event
+        async with tenant_session(tenant_id) as db:
+            snapshot = await load_event_snapshot(db, evaluation_id)
+        yield "retry: 3000\n\n" + format_sse(snapshot)
+        
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(message)
+    finally:
+        broker.unsubscribe(tenant_id, evaluation_id, queue)
+
+@router.get("/test/{evaluation_id}/events")
+async def stream_evaluation_events(evaluation_id: int, request: Request, tenant_id: int = Depends(get_tenant_id)):
+    """
+    Server-sent events for one evaluation: a snapshot, then response changes with running
+    raw-score totals as they commit, and the scores once calculated.
+    """
+    # No request-scoped session: the stream outlives the handler and opens its own when needed
+    async with tenant_session(tenant_id) as db:
+        found = await db.scalar(select(Evaluation.id).where(Evaluation.id == evaluation_id))
+        listen = await db.run_sync(uses_notify)
+    if not found:
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+    
+    return StreamingResponse(
+        evaluation_event_stream(tenant_id, evaluation_id, request, listen),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/test/{evaluation_id}/response")
-async def save_response(evaluation_id: int, response_data: ResponseUpdate, db: Session = Depends(get_db)):
-    """Save or update a response."""
+async def save_response(evaluation_id: int, response_data: ResponseUpdate, tenant_id: int = Depends(get_tenant_id)):
+    """
+    Save or update a response. Writes arriving close together for the same evaluation
+    share one transaction; "applied" is false if a newer write for the task already won.
+    """
     
-    # Validate response value
-    if response_data.response not in ["correct", "incorrect"]:
-        raise HTTPException(status_code=400, detail="Response must be 'correct' or 'incorrect'")
+    response_enum = parse_response_value(response_data.response)
+    sequences = {response_data.task_id: response_data.sequence} if response_data.sequence is not None else None
+    
+    try:
+        applied = await response_buffer.submit(tenant_id, evaluation_id, {response_data.task_id: response_enum}, sequences)
+    except (ResponseTargetNotFound, IntegrityError):
+        # Unknown task, or an evaluation that doesn't exist in this tenant (foreign keys carry the tenant)
+        raise HTTPException(status_code=404, detail="Evaluation or task not found")
+    return {"message": "Response saved", "applied": response_data.task_id in applied}
+
+@router.post("/test/{evaluation_id}/responses")
+async def save_responses(evaluation_id: int, batch: ResponseBatch, tenant_id: int = Depends(get_tenant_id)):
+    """Save or update many responses in one transaction."""
+    
+    # Later entries for the same task win, as if they had been clicked in order
+    responses = {}
+    sequences = {}
+    for item in batch.responses:
+        responses[item.task_id] = parse_response_value(item.response)
+        if item.sequence is not None:
+            sequences[item.task_id] = item.sequence
+        else:
+            sequences.pop(item.task_id, None)
+    
+    try:
+        saved = await response_buffer.submit(tenant_id, evaluation_id, responses, sequences)
+    except (ResponseTargetNotFound, IntegrityError):
+        raise HTTPException(status_code=404, detail="Evaluation or task not found")
+    return {"message": "Responses saved", "saved": len(saved)}
+
+@router.post("/test/{evaluation_id}/upload")
+async def upload_score_sheet(
+    evaluation_id: int,
+    test_type: TestTypeEnum,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_tenant_db)
+):
+    """
+    Upload a scanned score sheet as the raw request body (Content-Type: image/png, image/jpeg,
+    image/tiff or application/pdf). The body is streamed to disk, never buffered whole.
+    Uploads are kept for UPLOAD_RETENTION_SECONDS after they were last uploaded or ingested.
+    """
+    if not await db.get(Evaluation, evaluation_id):
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+    
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {UPLOAD_MAX_BYTES} bytes")
     
-    # Check if response exists
-    existing = db.query(EvaluationResponse).filter(
-        EvaluationResponse.evaluation_id == evaluation_id,
-        EvaluationResponse.task_id == response_data.task_id
-    ).first()
+    try:
+        stored = await save_upload_stream(request.stream(), test_type.value, request.headers.get("content-type"))
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     
-    response_enum = ResponseEnum.CORRECT if response_data.response == "correct" else ResponseEnum.INCORRECT
+    # Sweep interrupted and expired uploads once the response is sent
+    background_tasks.add_task(cleanup_stale_uploads)
     
-    if existing:
-        existing.response = response_enum
-    else:
-        new_response = EvaluationResponse(
-            evaluation_id=evaluation_id,
-            task_id=response_data.task_id,
-            response=response_enum
-        )
-        db.add(new_response)
+    return {
+        "file_path": str(stored.path),
+        "sha256": stored.sha256,
+        "size": stored.size,
+        "content_type": stored.content_type,
+        "duplicate": stored.duplicate
+    }
+
+@router.post("/test/{evaluation_id}/ingest", status_code=202)
+async def ingest_score_sheets(
+    evaluation_id: int,
+    ingest_data: IngestRequest,
+    background_tasks: BackgroundTasks,
+    tenant_id: int = Depends(get_tenant_id),
+    db: AsyncSession = Depends(get_tenant_db)
+):
+    """Start a background OCR job that turns uploaded score sheets into responses."""
+    if not await db.get(Evaluation, evaluation_id):
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+    if not ingest_data.sheets:
+        raise HTTPException(status_code=400, detail="No sheets to ingest")
+    
+    upload_root = UPLOAD_DIR.resolve()
+    sheets = []
+    for sheet in ingest_data.sheets:
+        path = Path(sheet.file_path).resolve()
+        if path.parent != upload_root or not path.is_file():
+            raise HTTPException(status_code=400, detail=f"Unknown upload: {sheet.file_path}")
+        if path.suffix == ".pdf":
+            raise HTTPException(status_code=400, detail=f"PDF sheets must be uploaded as images: {sheet.file_path}")
+        touch_upload(path)
+        sheets.append((str(path), sheet.test_type.value))
+    
+    job = await create_ingestion_job(db, evaluation_id, sheets)
+    background_tasks.add_task(run_ingestion_job, tenant_id, job.id)
+    return describe_ingestion_job(job)
+
+@router.get("/ingest/{job_id}")
+async def get_ingestion_status(
+    job_id: str,
+    tenant_id: int = Depends(get_tenant_id),
+    db: AsyncSession = Depends(get_tenant_db)
+):
+    """Get the progress of a score sheet ingestion job, from any worker."""
+    job = await get_ingestion_job(db, job_id)
+    if not job or job.tenant_id != tenant_id:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return describe_ingestion_job(job)
+
+def format_scores(scores, age_years: int, age_months: int) -> dict:
+    """Shape calculated or stored scores for the results panel."""
+    return {
+        "student_age": f"{age_years}y {age_months}m",
+        "lc_scores": {
+            "lc_raw_score": scores["listening_raw_score"],
+            "lc_standard_score": scores["listening_standard_score"],
+            "lc_percentile_rank": scores["listening_percentile_rank"]
+        },
+        "oe_scores": {
+            "oe_raw_score": scores["oral_raw_score"],
+            "oe_standard_score": scores["oral_standard_score"],
+            "oe_percentile_rank": scores["oral_percentile_rank"]
+        },
+        "composite_scores": {
+            "lc_standard_score": scores["listening_standard_score"],
+            "oe_standard_score": scores["oral_standard_score"],
+            "sum_standard_scores": scores["sum_standard_scores"],
+            "composite_standard_score": scores["composite_standard_score"],
+            "composite_percentile_rank": scores["composite_percentile_rank"]
+        }
+    }
+
+@router.get("/test/{evaluation_id}/scores")
+async def get_evaluation_scores(evaluation_id: int, db: AsyncSession = Depends(get_tenant_db)):
+    """Get stored scores for an evaluation without recalculating."""
+    result = await db.execute(
+        select(EvaluationScore, Evaluation.age_years, Evaluation.age_months).join(
+            Evaluation, Evaluation.id == EvaluationScore.evaluation_id
+        ).where(EvaluationScore.evaluation_id == evaluation_id)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Scores not calculated for this evaluation")
     
-    db.commit()
-    return {"message": "Response saved"}
+    record, age_years, age_months = row
+    return format_scores({column: getattr(record, column) for column in SCORE_COLUMNS}, age_years, age_months)
 
 @router.post("/test/{evaluation_id}/calculate")
-async def calculate_evaluation_scores(evaluation_id: int, db: Session = Depends(get_db)):
-    """Calculate scores for evaluation."""
+async def calculate_evaluation_scores(evaluation_id: int, db: AsyncSession = Depends(get_tenant_db)):
+    """Calculate scores for evaluation and store them."""
     
-    evaluation = db.query(Evaluation).filter(Evaluation.id == evaluation_id).first()
+    # Lock the evaluation first: response writes hold a share lock on it, so none can commit
+    # between reading the responses here and storing the scores they would have to adjust
+    evaluation = await db.get(Evaluation, evaluation_id, with_for_update=True)
     if not evaluation:
         raise HTTPException(status_code=404, detail="Evaluation not found")
     
     try:
-        scores = calculate_scores_for_evaluation(db, evaluation_id)
+        scores = await db.run_sync(calculate_scores_for_evaluation, evaluation_id)
+        await db.run_sync(save_evaluation_scores, evaluation_id, scores)
         
         # Mark evaluation as completed
         evaluation.status = StatusEnum.COMPLETED
         evaluation.completed_at = datetime.utcnow()
-        db.commit()
+        formatted = format_scores(scores, evaluation.age_years, evaluation.age_months)
+        await db.run_sync(publish_event, evaluation_id, "scores", {"status": StatusEnum.COMPLETED.value, "scores": formatted})
+        await db.commit()
         
-        return {
-            "student_age": f"{evaluation.age_years}y {evaluation.age_months}m",
-            "lc_scores": {
-                "lc_raw_score": scores["listening_raw_score"],
-                "lc_standard_score": scores["listening_standard_score"],
-                "lc_percentile_rank": scores["listening_percentile_rank"]
-            },
-            "oe_scores": {
-                "oe_raw_score": scores["oral_raw_score"],
-                "oe_standard_score": scores["oral_standard_score"],
-                "oe_percentile_rank": scores["oral_percentile_rank"]
-            },
-            "composite_scores": {
-                "lc_standard_score": scores["listening_standard_score"],
-                "oe_standard_score": scores["oral_standard_score"],
-                "sum_standard_scores": scores["sum_standard_scores"],
-                "composite_standard_score": scores["composite_standard_score"],
-                "composite_percentile_rank": scores["composite_percentile_rank"]
-            }
-        }
+        return formatted
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error calculating scores: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error calculating scores: {str(e)}")
+
+@router.post("/norms/reload")
+async def reload_norm_tables(db: AsyncSession = Depends(get_async_db)):
+    """Reload the in-memory norm tables after Table A1/A2 data changes outside import_norms.py; every worker follows."""
+    index = await db.run_sync(reload_norm_index)
+    await db.commit()
+    return {"message": "Norm tables reloaded", **index.stats()}
@@ -0,0 +1,118 @@
+import numpy as np
+from typing import Dict, List, Sequence
+
+from app.services.calculation_service import NormIndex, NormGrid, CompositeTable
+from app.services.catalog_service import TaskCatalog
+
+PERCENTILES = [10, 25, 50, 75, 90]
+
+def describe(values: np.ndarray) -> Dict:
+    """Count, mean, spread and percentiles of the non-missing values."""
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {"count": 0}
+    percentiles = np.percentile(values, PERCENTILES)
+    return {
+        "count": int(values.size),
+        "mean": round(float(values.mean()), 2),
+        "std": round(float(values.std()), 2),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "percentiles": {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, percentiles)}
+    }
+
+def lookup_grid(grid: NormGrid, age_years: np.ndarray, age_months: np.ndarray, raw: np.ndarray) -> np.ndarray:
+    """Vectorised Table A1 standard score lookup; NaN where the table has no entry."""
+    standard = np.array([cell[0] if cell else np.nan for cell in grid.cells], dtype=float)
+    years = age_years - grid.min_years
+    months = age_months - grid.min_months
+    raw = raw - grid.min_raw
+    valid = (
+        (years >= 0) & (years < grid.years_span)
+        & (months >= 0) & (months < grid.months_span)
+        & (raw >= 0) & (raw < grid.raw_span)
+    )
+    result = np.full(raw.shape, np.nan)
+    offsets = ((years * grid.months_span + months) * grid.raw_span + raw)[valid]
+    result[valid] = standard[offsets]
+    return result
+
+def lookup_composite(table: CompositeTable, sums: np.ndarray) -> np.ndarray:
+    """Vectorised Table A2 composite lookup; NaN for missing sums or out-of-table values."""
+    composite = np.array([cell[0] if cell else np.nan for cell in table.cells], dtype=float)
+    result = np.full(sums.shape, np.nan)
+    known = ~np.isnan(sums)
+    offsets = np.zeros(sums.shape, dtype=int)
+    offsets[known] = sums[known].astype(int) - table.min_sum
+    valid = known & (offsets >= 0) & (offsets < len(table.cells))
+    result[valid] = composite[offsets[valid]]
+    return result
+
+def summarize_cohort(evaluations: Sequence[tuple], items: Sequence[tuple], categories: List[str],
+                     catalog: TaskCatalog, norms: NormIndex) -> Dict:
+    """
+    Score distributions from per-evaluation counts aggregated in the database.
+    evaluations are (evaluation_id, school, age_years, age_months, listening_correct, oral_correct,
+    then attempted and correct for each of categories) tuples; items are (task_id, attempted, correct).
+    """
+    if not evaluations:
+        return {"evaluations": 0, "overall": {}, "by_school": {}, "by_age_band": {}, "by_category": {}, "items": []}
+
+    columns = list(zip(*evaluations))
+    count = len(evaluations)
+    eval_schools = np.asarray(columns[1], dtype=object)
+    eval_years = np.asarray(columns[2], dtype=int)
+    eval_months = np.asarray(columns[3], dtype=int)
+    listening_raw = np.asarray(columns[4], dtype=float)
+    oral_raw = np.asarray(columns[5], dtype=float)
+
+    listening_standard = lookup_grid(norms.listening, eval_years, eval_months, listening_raw.astype(int))
+    oral_standard = lookup_grid(norms.oral, eval_years, eval_months, oral_raw.astype(int))
+    composite = lookup_composite(norms.composite, listening_standard + oral_standard)
+
+    scores = {
+        "listening_raw": listening_raw,
+        "listening_standard": listening_standard,
+        "oral_raw": oral_raw,
+        "oral_standard": oral_standard,
+        "composite_standard": composite
+    }
+
+    def distributions(mask: np.ndarray) -> Dict:
+        return {"evaluations": int(mask.sum()), **{name: describe(values[mask]) for name, values in scores.items()}}
+
+    everyone = np.ones(count, dtype=bool)
+    by_school = {str(school): distributions(eval_schools == school) for school in np.unique(eval_schools)}
+    by_age_band = {f"{years}": distributions(eval_years == years) for years in np.unique(eval_years)}
+
+    # Raw correct per category, over evaluations that attempted at least one item in it
+    by_category = {}
+    for offset, name in enumerate(categories):
+        attempted = np.asarray(columns[6 + 2 * offset], dtype=int) > 0
+        raw = np.asarray(columns[7 + 2 * offset], dtype=float)
+        by_category[name] = describe(raw[attempted])
+
+    # Item difficulty: share of attempts answered correctly
+    counts = {task_id: (attempted, correct) for task_id, attempted, correct in items}
+    item_stats: List[Dict] = []
+    for task in catalog.oral_tasks + catalog.listening_tasks:
+        attempted, correct = counts.get(task["id"], (0, 0))
+        item_stats.append({
+            "task_id": task["id"],
+            "item": task["item"],
+            "test_type": catalog.task_test_types[task["id"]],
+            "category": task["category"],
+            "attempted": int(attempted),
+            "correct": int(correct),
+            "pass_rate": round(correct / attempted, 4) if attempted else None
+        })
+    item_stats.sort(key=lambda item: (item["pass_rate"] is None, item["pass_rate"]))
+
+    return {
+        "evaluations": int(count),
+        "overall": distributions(everyone),
+        "by_school": by_school,
+        "by_age_band": by_age_band,
+        "by_category": by_category,
+        "items": item_stats
+    }
@@ -1,9 +1,43 @@
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from sqlalchemy import delete, exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+import asyncio
+import hashlib
 import os
+import threading
+import time
+import uuid
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.database.connection import get_async_db
+from app.models.models import RevokedToken, User
+
+# bcrypt work factor; hashes below it are upgraded the next time the user logs in
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS
+)
+
+# Hashing runs on its own small pool so bcrypt never blocks the event loop,
+# and the number of waiting requests is capped instead of queueing without bound
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_pending = 0
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash operations are already queued."""
 
 SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret-key")
 ALGORITHM = "HS256"
@@ -14,11 +48,160 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+async def _run_hashing(func, *args):
+    global _hash_pending
+    if _hash_pending >= PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusy()
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the hashing pool.
+    Returns (valid, new_hash); new_hash is set when the stored hash should be upgraded.
+    """
+    return await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
\ No newline at end of file
+    # jti keeps two logins in the same second from sharing a token, and so a revocation
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def decode_access_token(token: str) -> Dict:
+    """Decode and validate a JWT; raises JWTError if it is invalid or expired."""
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    if not claims.get("sub"):
+        raise JWTError("Token has no subject")
+    return claims
+
+class TokenCache:
+    """Small TTL + LRU cache of token -> (claims, user), with revocation."""
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict, User]]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Tuple[Dict, User]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, claims, user = entry
+            if expires_at <= now:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims, user
+
+    def put(self, token: str, claims: Dict, user: User):
+        # Never cache past the token's own expiry
+        token_ttl = claims["exp"] - time.time() if "exp" in claims else self.ttl_seconds
+        expires_at = time.monotonic() + min(self.ttl_seconds, token_ttl)
+        with self._lock:
+            self._entries[token] = (expires_at, claims, user)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def revoke(self, token: str, claims: Optional[Dict] = None):
+        """Drop a token from the cache and reject it until it expires."""
+        exp = (claims or {}).get("exp", time.time() + self.ttl_seconds)
+        with self._lock:
+            self._entries.pop(token, None)
+            self._revoked[token] = exp
+            now = time.time()
+            for revoked_token in [t for t, t_exp in self._revoked.items() if t_exp <= now]:
+                del self._revoked[revoked_token]
+
+    def is_revoked(self, token: str) -> bool:
+        with self._lock:
+            return token in self._revoked
+
+    def invalidate_user(self, username: str):
+        """Drop every cached token for a user, e.g. after a password change."""
+        with self._lock:
+            for token in [t for t, entry in self._entries.items() if entry[1].get("sub") == username]:
+                del self._entries[token]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+# Revocations are stored in the database, but a worker only looks there on a cache miss:
+# a token logged out elsewhere keeps working here for at most this long
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL_SECONDS)
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+def credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Resolve the bearer token to a User, serving repeat tokens from the cache."""
+    if credentials is None:
+        raise credentials_exception()
+    token = credentials.credentials
+    
+    cached = token_cache.get(token)
+    if cached:
+        return cached[1]
+    if token_cache.is_revoked(token):
+        raise credentials_exception()
+    
+    try:
+        claims = decode_access_token(token)
+    except JWTError:
+        raise credentials_exception()
+    
+    # The user and whether any worker revoked the token, in one round trip
+    result = await db.execute(select(
+        User, exists().where(RevokedToken.token_hash == token_digest(token))
+    ).where(User.username == claims["sub"]))
+    row = result.first()
+    if not row:
+        raise credentials_exception()
+    user, revoked = row
+    if revoked:
+        token_cache.revoke(token, claims)
+        raise credentials_exception()
+    
+    # Detach so the cached instance can be shared across requests
+    db.expunge(user)
+    token_cache.put(token, claims, user)
+    return user
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+async def revoke_token(db: AsyncSession, token: str, claims: Optional[Dict] = None):
+    """
+    Revoke a token in every worker: immediately here, and in the others once their cached
+    entry expires (TOKEN_CACHE_TTL_SECONDS). Expired revocations are pruned on the way.
+    """
+    token_cache.revoke(token, claims)
+    expires_at = datetime.utcfromtimestamp((claims or {}).get("exp", time.time() + TOKEN_CACHE_TTL_SECONDS))
+    await db.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow()))
+    await db.merge(RevokedToken(token_hash=token_digest(token), expires_at=expires_at))
+    await db.commit()
@@ -0,0 +1,61 @@
+import os
+import threading
+import time
+from sqlalchemy import select, update
+from app.models.models import CacheVersion
+from typing import Callable, Generic, Optional, TypeVar
+
+# How often each worker asks the database whether a cache it holds has been reloaded elsewhere
+CACHE_VERSION_CHECK_SECONDS = float(os.getenv("CACHE_VERSION_CHECK_SECONDS", "5"))
+
+T = TypeVar("T")
+
+def get_cache_version(db, name: str) -> int:
+    """Stored version of a cache; db is a Session or a Connection."""
+    return db.execute(select(CacheVersion.version).where(CacheVersion.name == name)).scalar() or 0
+
+def bump_cache_version(db, name: str):
+    """Make every worker reload a cache once the caller's transaction commits."""
+    db.execute(update(CacheVersion).where(CacheVersion.name == name).values(version=CacheVersion.version + 1))
+
+class VersionedCache(Generic[T]):
+    """
+    A process-wide value built from the database. At most every CACHE_VERSION_CHECK_SECONDS
+    a worker compares its copy's version with the stored one, and rebuilds the value when
+    another process has bumped it.
+    """
+
+    def __init__(self, name: str, load: Callable[..., T]):
+        self.name = name
+        self._load = load
+        self._value: Optional[T] = None
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db) -> T:
+        value = self._value
+        if value is not None and time.monotonic() - self._checked_at < CACHE_VERSION_CHECK_SECONDS:
+            return value
+        version = get_cache_version(db, self.name)
+        if value is not None and version == self._version:
+            self._checked_at = time.monotonic()
+            return value
+        # Load outside the lock: under AsyncSession.run_sync the load yields to the event
+        # loop, and a second request blocking on the lock would stall the whole loop
+        loaded = self._load(db)
+        return self._store(loaded, version)
+
+    def reload(self, db) -> T:
+        """Rebuild now and bump the stored version so the other workers follow; does not commit."""
+        bump_cache_version(db, self.name)
+        version = get_cache_version(db, self.name)
+        return self._store(self._load(db), version)
+
+    def _store(self, value: T, version: int) -> T:
+        with self._lock:
+            # Of two loads racing, the one that saw the newer version wins
+            if self._version is None or version >= self._version:
+                self._value, self._version = value, version
+                self._checked_at = time.monotonic()
+            return self._value
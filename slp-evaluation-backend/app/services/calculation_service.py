@@ -1,14 +1,125 @@
 from sqlalchemy.orm import Session
-from app.models.models import TableA1LC, TableA1OE, TableA2, EvaluationResponse, Task, TestType, Category
+from app.models.models import TableA1LC, TableA1OE, TableA2, Evaluation, EvaluationResponse, EvaluationScore, Task, TestType, ResponseEnum
+from app.services.cache_service import VersionedCache
 from typing import Dict, List, Tuple, Optional
 
+class NormGrid:
+    """Dense (age_years, age_months, raw_score) -> (standard, percentile) grid for one Table A1."""
+
+    def __init__(self, rows: List[Tuple[int, int, int, int, str]]):
+        self.size = len(rows)
+        if not rows:
+            self.cells = []
+            self.min_years = self.min_months = self.min_raw = 0
+            self.years_span = self.months_span = self.raw_span = 0
+            return
+
+        self.min_years = min(row[0] for row in rows)
+        self.min_months = min(row[1] for row in rows)
+        self.min_raw = min(row[2] for row in rows)
+        self.years_span = max(row[0] for row in rows) - self.min_years + 1
+        self.months_span = max(row[1] for row in rows) - self.min_months + 1
+        self.raw_span = max(row[2] for row in rows) - self.min_raw + 1
+
+        self.cells: List[Optional[Tuple[int, str]]] = [None] * (self.years_span * self.months_span * self.raw_span)
+        for age_years, age_months, raw_score, standard_score, percentile_rank in rows:
+            self.cells[self._offset(age_years, age_months, raw_score)] = (standard_score, percentile_rank)
+
+    def _offset(self, age_years: int, age_months: int, raw_score: int) -> int:
+        return ((age_years - self.min_years) * self.months_span + (age_months - self.min_months)) * self.raw_span + (raw_score - self.min_raw)
+
+    def get(self, age_years: int, age_months: int, raw_score: int) -> Optional[Tuple[int, str]]:
+        if not (0 <= age_years - self.min_years < self.years_span
+                and 0 <= age_months - self.min_months < self.months_span
+                and 0 <= raw_score - self.min_raw < self.raw_span):
+            return None
+        return self.cells[self._offset(age_years, age_months, raw_score)]
+
+class CompositeTable:
+    """Table A2 as a direct array indexed by sum of standard scores."""
+
+    def __init__(self, rows: List[Tuple[int, int, str]]):
+        self.size = len(rows)
+        self.min_sum = min((row[0] for row in rows), default=0)
+        span = max((row[0] for row in rows), default=-1) - self.min_sum + 1
+        self.cells: List[Optional[Tuple[int, str]]] = [None] * span
+        for sum_standard_scores, composite_standard_score, composite_percentile_rank in rows:
+            self.cells[sum_standard_scores - self.min_sum] = (composite_standard_score, composite_percentile_rank)
+
+    def get(self, sum_standard_scores: int) -> Optional[Tuple[int, str]]:
+        offset = sum_standard_scores - self.min_sum
+        if not 0 <= offset < len(self.cells):
+            return None
+        return self.cells[offset]
+
+class NormIndex:
+    """In-memory snapshot of the static norm tables (A1 LC, A1 OE and A2)."""
+
+    def __init__(self, listening: NormGrid, oral: NormGrid, composite: CompositeTable):
+        self.listening = listening
+        self.oral = oral
+        self.composite = composite
+
+    @classmethod
+    def load(cls, db: Session) -> "NormIndex":
+        def grid_rows(table):
+            return db.query(
+                table.age_years, table.age_months, table.raw_score,
+                table.standard_score, table.percentile_rank
+            ).all()
+
+        composite_rows = db.query(
+            TableA2.sum_standard_scores, TableA2.composite_standard_score, TableA2.composite_percentile_rank
+        ).all()
+
+        return cls(
+            listening=NormGrid([tuple(row) for row in grid_rows(TableA1LC)]),
+            oral=NormGrid([tuple(row) for row in grid_rows(TableA1OE)]),
+            composite=CompositeTable([tuple(row) for row in composite_rows])
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "listening_rows": self.listening.size,
+            "oral_rows": self.oral.size,
+            "composite_rows": self.composite.size
+        }
+
+_norm_index = VersionedCache("norms", NormIndex.load)
+
+def get_norm_index(db: Session) -> NormIndex:
+    """Return the process-wide norm index, loading it on first use and after a reload anywhere."""
+    return _norm_index.get(db)
+
+def reload_norm_index(db: Session) -> NormIndex:
+    """Rebuild the norm index and have every other worker follow once the caller commits."""
+    return _norm_index.reload(db)
+
 def calculate_scores_for_evaluation(db: Session, evaluation_id: int) -> Dict:
     """Calculate all scores for an evaluation."""
     
-    # Get all responses for this evaluation with joined task, test_type, and category data
-    responses = db.query(EvaluationResponse).filter(
-        EvaluationResponse.evaluation_id == evaluation_id
-    ).join(Task).join(TestType).join(Category).all()
+    # Fetch the student's age and every response with its test type and description
+    # in one statement; the outer joins keep the evaluation row when there are no responses
+    rows = db.query(
+        Evaluation.age_years,
+        Evaluation.age_months,
+        TestType.name,
+        EvaluationResponse.response,
+        Task.task_description
+    ).select_from(Evaluation).outerjoin(
+        EvaluationResponse, EvaluationResponse.evaluation_id == Evaluation.id
+    ).outerjoin(
+        Task, Task.id == EvaluationResponse.task_id
+    ).outerjoin(
+        TestType, TestType.id == Task.test_type_id
+    ).filter(
+        Evaluation.id == evaluation_id
+    ).order_by(Task.id).all()
+    
+    if not rows:
+        raise ValueError(f"Evaluation {evaluation_id} not found")
+    
+    age_years, age_months = rows[0].age_years, rows[0].age_months
     
     # Separate by test type and count correct responses
     listening_correct = 0
@@ -18,31 +129,37 @@ def calculate_scores_for_evaluation(db: Session, evaluation_id: int) -> Dict:
     oral_strengths = []
     oral_weaknesses = []
     
-    for response in responses:
-        if response.task.test_type.name == "listening":
-            if response.response.value == "correct":
+    for _, _, test_type, response, task_description in rows:
+        if test_type == "listening":
+            if response == ResponseEnum.CORRECT:
                 listening_correct += 1
-                listening_strengths.append(response.task.task_description)
+                listening_strengths.append(task_description)
             else:
-                listening_weaknesses.append(response.task.task_description)
-        elif response.task.test_type.name == "oral":
-            if response.response.value == "correct":
+                listening_weaknesses.append(task_description)
+        elif test_type == "oral":
+            if response == ResponseEnum.CORRECT:
                 oral_correct += 1
-                oral_strengths.append(response.task.task_description)
+                oral_strengths.append(task_description)
             else:
-                oral_weaknesses.append(response.task.task_description)
+                oral_weaknesses.append(task_description)
     
-    # Get evaluation details for age lookup
-    evaluation = db.query(EvaluationResponse).filter(
-        EvaluationResponse.evaluation_id == evaluation_id
-    ).first().evaluation
+    return {
+        **score_raw_counts(db, listening_correct, oral_correct, age_years, age_months),
+        "listening_strengths": listening_strengths,
+        "listening_weaknesses": listening_weaknesses,
+        "oral_strengths": oral_strengths,
+        "oral_weaknesses": oral_weaknesses
+    }
+
+def score_raw_counts(db: Session, listening_correct: int, oral_correct: int, age_years: int, age_months: int) -> Dict:
+    """Turn raw counts into standard, percentile and composite scores."""
     
     # Look up standard scores and percentile ranks
     listening_standard, listening_percentile = lookup_scores(
-        db, listening_correct, evaluation.age_years, evaluation.age_months, "listening"
+        db, listening_correct, age_years, age_months, "listening"
     )
     oral_standard, oral_percentile = lookup_scores(
-        db, oral_correct, evaluation.age_years, evaluation.age_months, "oral"
+        db, oral_correct, age_years, age_months, "oral"
     )
     
     # Calculate composite
@@ -62,42 +179,61 @@ def calculate_scores_for_evaluation(db: Session, evaluation_id: int) -> Dict:
         "oral_percentile_rank": oral_percentile,
         "composite_standard_score": composite_standard,
         "composite_percentile_rank": composite_percentile,
-        "sum_standard_scores": sum_standard_scores,
-        "listening_strengths": listening_strengths,
-        "listening_weaknesses": listening_weaknesses,
-        "oral_strengths": oral_strengths,
-        "oral_weaknesses": oral_weaknesses
+        "sum_standard_scores": sum_standard_scores
     }
 
+SCORE_COLUMNS = [
+    "listening_raw_score", "listening_standard_score", "listening_percentile_rank",
+    "oral_raw_score", "oral_standard_score", "oral_percentile_rank",
+    "sum_standard_scores", "composite_standard_score", "composite_percentile_rank"
+]
+
+def save_evaluation_scores(db: Session, evaluation_id: int, scores: Dict) -> EvaluationScore:
+    """Store calculated scores in evaluation_scores; does not commit."""
+    values = {column: scores[column] for column in SCORE_COLUMNS}
+    record = db.get(EvaluationScore, evaluation_id)
+    if record:
+        for column, value in values.items():
+            setattr(record, column, value)
+    else:
+        record = EvaluationScore(evaluation_id=evaluation_id, **values)
+        db.add(record)
+    return record
+
+def apply_raw_score_deltas(db: Session, record: EvaluationScore, age_years: int, age_months: int, listening_delta: int, oral_delta: int):
+    """Adjust stored raw counts by the given deltas and re-derive the looked-up scores."""
+    if not listening_delta and not oral_delta:
+        return
+    scores = score_raw_counts(
+        db,
+        record.listening_raw_score + listening_delta,
+        record.oral_raw_score + oral_delta,
+        age_years,
+        age_months
+    )
+    for column in SCORE_COLUMNS:
+        setattr(record, column, scores[column])
+
 def lookup_scores(db: Session, raw_score: int, age_years: int, age_months: int, test_type: str) -> Tuple[Optional[int], Optional[str]]:
-    """Look up standard score and percentile rank from database."""
+    """Look up standard score and percentile rank from the in-memory norm index."""
+    index = get_norm_index(db)
     if test_type == "listening":
-        score_record = db.query(TableA1LC).filter(
-            TableA1LC.age_years == age_years,
-            TableA1LC.age_months == age_months,
-            TableA1LC.raw_score == raw_score
-        ).first()
+        score_record = index.listening.get(age_years, age_months, raw_score)
     elif test_type == "oral":
-        score_record = db.query(TableA1OE).filter(
-            TableA1OE.age_years == age_years,
-            TableA1OE.age_months == age_months,
-            TableA1OE.raw_score == raw_score
-        ).first()
+        score_record = index.oral.get(age_years, age_months, raw_score)
     else:
         return None, None
     
     if score_record:
-        return score_record.standard_score, score_record.percentile_rank
+        return score_record
     else:
         return None, None
 
 def lookup_composite_score(db: Session, sum_standard_scores: int) -> Tuple[Optional[int], Optional[str]]:
     """Look up composite score from sum of standard scores."""
-    composite_record = db.query(TableA2).filter(
-        TableA2.sum_standard_scores == sum_standard_scores
-    ).first()
+    composite_record = get_norm_index(db).composite.get(sum_standard_scores)
     
     if composite_record:
-        return composite_record.composite_standard_score, composite_record.composite_percentile_rank
+        return composite_record
     else:
-        return None, None
\ No newline at end of file
+        return None, None
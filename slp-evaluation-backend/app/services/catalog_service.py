@@ -0,0 +1,78 @@
+import hashlib
+import json
+from sqlalchemy.orm import Session
+from app.models.models import Task, TestType, Category
+from app.services.cache_service import VersionedCache
+from typing import Dict, List, Optional
+
+class TaskCatalog:
+    """Pre-grouped oral and listening task lists with a content-derived version."""
+
+    def __init__(self, oral_tasks: List[Dict], listening_tasks: List[Dict]):
+        self.oral_tasks = oral_tasks
+        self.listening_tasks = listening_tasks
+        self.task_test_types = {task["id"]: "oral" for task in oral_tasks}
+        self.task_test_types.update({task["id"]: "listening" for task in listening_tasks})
+        self.task_ids_by_item = {("oral", task["item"]): task["id"] for task in oral_tasks}
+        self.task_ids_by_item.update({("listening", task["item"]): task["id"] for task in listening_tasks})
+        payload = json.dumps([oral_tasks, listening_tasks], sort_keys=True, ensure_ascii=False)
+        self.version = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def load(cls, db: Session) -> "TaskCatalog":
+        rows = db.query(
+            Task.id, Task.item, Category.name, Task.task_description, TestType.name
+        ).join(TestType, TestType.id == Task.test_type_id).join(
+            Category, Category.id == Task.category_id
+        ).order_by(TestType.name, Task.item).all()
+
+        oral_tasks = []
+        listening_tasks = []
+        for task_id, item, category, task_description, test_type in rows:
+            task_data = {
+                "id": task_id,
+                "item": item,
+                "category": category,
+                "task_description": task_description
+            }
+            if test_type == "oral":
+                oral_tasks.append(task_data)
+            else:
+                listening_tasks.append(task_data)
+
+        return cls(oral_tasks, listening_tasks)
+
+    def with_responses(self, response_lookup: Dict[int, str]) -> Dict[str, List[Dict]]:
+        """Overlay one evaluation's responses onto the cached task lists."""
+        return {
+            "oral_tasks": [
+                {**task, "response": response_lookup.get(task["id"], "")} for task in self.oral_tasks
+            ],
+            "listening_tasks": [
+                {**task, "response": response_lookup.get(task["id"], "")} for task in self.listening_tasks
+            ]
+        }
+
+    def as_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "oral_tasks": self.oral_tasks,
+            "listening_tasks": self.listening_tasks
+        }
+
+_task_catalog = VersionedCache("catalog", TaskCatalog.load)
+
+def get_task_catalog(db: Session) -> TaskCatalog:
+    """Return the process-wide task catalog, loading it on first use and after a reload anywhere."""
+    return _task_catalog.get(db)
+
+def reload_task_catalog(db: Session) -> TaskCatalog:
+    """Rebuild the task catalog and have every other worker follow once the caller commits."""
+    return _task_catalog.reload(db)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against a quoted ETag."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -0,0 +1,201 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import threading
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from typing import Dict, Optional, Set, Tuple
+
+from app.services.tenant_service import evaluation_tenant_id
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "slp_evaluation_events"
+# "auto" fans events out through Postgres LISTEN/NOTIFY when the database is Postgres, so every
+# worker sees every commit; "false" keeps them in-process (single worker, or SQLite)
+EVENTS_USE_NOTIFY = os.getenv("EVENTS_USE_NOTIFY", "auto").lower()
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+# NOTIFY payloads must stay under 8000 bytes; bigger events go out as a resync request
+MAX_NOTIFY_PAYLOAD = 7900
+
+RESYNC = {"type": "resync"}
+
+# Subscriptions are per (tenant_id, evaluation_id), so an event only ever reaches streams of its own tenant
+EventKey = Tuple[int, int]
+
+class EvaluationEventBroker:
+    """In-process pub/sub of evaluation events, with optional Postgres LISTEN/NOTIFY fan-out."""
+
+    def __init__(self):
+        self._subscribers: Dict[EventKey, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sequence = itertools.count(1)
+        # One LISTEN connection per database, shared by every pool (tenant) pointing at it
+        self._listener_tasks: Dict[str, asyncio.Task] = {}
+        self._listening: Dict[str, asyncio.Event] = {}
+        self._lock = threading.Lock()
+
+    def has_subscribers(self, tenant_id: int, evaluation_id: int) -> bool:
+        return bool(self._subscribers.get((tenant_id, evaluation_id)))
+
+    def subscribe(self, tenant_id: int, evaluation_id: int) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault((tenant_id, evaluation_id), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, tenant_id: int, evaluation_id: int, queue: asyncio.Queue):
+        key = (tenant_id, evaluation_id)
+        with self._lock:
+            queues = self._subscribers.get(key)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[key]
+
+    def dispatch(self, tenant_id: int, evaluation_id: int, event: Dict):
+        """Deliver an event to local subscribers; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or not self.has_subscribers(tenant_id, evaluation_id):
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver((tenant_id, evaluation_id), event)
+        else:
+            loop.call_soon_threadsafe(self._deliver, (tenant_id, evaluation_id), event)
+
+    def _deliver(self, key: EventKey, event: Dict):
+        event = {**event, "id": next(self._sequence)}
+        with self._lock:
+            queues = list(self._subscribers.get(key, ()))
+        for queue in queues:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A stalled reader lost events; make it reload instead of showing a stale view
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({**RESYNC, "id": event["id"]})
+
+    def broadcast_resync(self):
+        with self._lock:
+            keys = list(self._subscribers)
+        for key in keys:
+            self._deliver(key, {**RESYNC, "evaluation_id": key[1]})
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        # The tenant travels beside the event and is never sent to clients
+        tenant_id = message.pop("tenant_id", None)
+        if not isinstance(tenant_id, int) or not isinstance(message.get("evaluation_id"), int):
+            return
+        self._deliver((tenant_id, message["evaluation_id"]), message)
+
+    async def ensure_listener(self, async_engine, timeout: float = 5.0):
+        """
+        Start the LISTEN connection the first time a stream opens in this worker, and wait
+        until it is listening so nothing committed after the caller's snapshot is missed.
+        """
+        database = async_engine.url.render_as_string(hide_password=True)
+        listening = self._listening.get(database)
+        if listening is None:
+            listening = self._listening[database] = asyncio.Event()
+        task = self._listener_tasks.get(database)
+        if task is None or task.done():
+            self._listener_tasks[database] = asyncio.get_running_loop().create_task(
+                self._listen(async_engine, listening)
+            )
+        try:
+            await asyncio.wait_for(listening.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Evaluation event listener is not connected yet")
+
+    async def _listen(self, async_engine, listening: asyncio.Event):
+        delay = 1.0
+        while True:
+            try:
+                async with async_engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    driver = raw.driver_connection
+                    lost = asyncio.Event()
+                    driver.add_termination_listener(lambda connection: lost.set())
+                    await driver.add_listener(EVENTS_CHANNEL, self._on_notify)
+                    listening.set()
+                    delay = 1.0
+                    await lost.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Evaluation event listener disconnected: %s", e)
+            listening.clear()
+            # Anything published while we were disconnected is gone; have clients reload
+            self.broadcast_resync()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def close(self):
+        for task in self._listener_tasks.values():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._listener_tasks.clear()
+        self._listening.clear()
+
+broker = EvaluationEventBroker()
+
+def uses_notify(db: Session) -> bool:
+    if EVENTS_USE_NOTIFY in ("0", "false", "no"):
+        return False
+    return db.get_bind().dialect.name == "postgresql"
+
+def wants_events(db: Session, evaluation_id: int) -> bool:
+    """Whether anyone could be listening; with NOTIFY another worker might be."""
+    if uses_notify(db):
+        return True
+    tenant_id = evaluation_tenant_id(db, evaluation_id)
+    return tenant_id is not None and broker.has_subscribers(tenant_id, evaluation_id)
+
+def publish_event(db: Session, evaluation_id: int, event_type: str, data: Dict):
+    """
+    Queue an event for the streams of the evaluation's tenant, delivered only if the current
+    transaction commits. On Postgres the NOTIFY itself is transactional; otherwise the
+    session holds it until commit.
+    """
+    tenant_id = evaluation_tenant_id(db, evaluation_id)
+    if tenant_id is None:
+        return
+    message = {"type": event_type, "evaluation_id": evaluation_id, **data}
+    if uses_notify(db):
+        payload = json.dumps({**message, "tenant_id": tenant_id}, separators=(",", ":"))
+        if len(payload) > MAX_NOTIFY_PAYLOAD:
+            payload = json.dumps({**RESYNC, "evaluation_id": evaluation_id, "tenant_id": tenant_id})
+        db.execute(select(func.pg_notify(EVENTS_CHANNEL, payload)))
+    elif broker.has_subscribers(tenant_id, evaluation_id):
+        db.info.setdefault("pending_events", []).append((tenant_id, message))
+
+@event.listens_for(Session, "after_commit")
+def dispatch_pending_events(session: Session):
+    for tenant_id, message in session.info.pop("pending_events", ()):
+        broker.dispatch(tenant_id, message["evaluation_id"], message)
+
+@event.listens_for(Session, "after_rollback")
+def discard_pending_events(session: Session):
+    session.info.pop("pending_events", None)
+
+def format_sse(message: Dict) -> str:
+    """One server-sent event: the sequence number as id, the type as the event name."""
+    data = {key: value for key, value in message.items() if key != "id"}
+    return f"id: {message.get('id', 0)}\nevent: {message['type']}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
@@ -0,0 +1,117 @@
+import csv
+import enum
+import io
+import json
+import os
+from datetime import date, datetime
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+from typing import AsyncIterator, Dict, List, Sequence
+
+from app.models.models import Evaluation, EvaluationResponse, EvaluationScore
+from app.services.calculation_service import SCORE_COLUMNS
+from app.services.catalog_service import get_task_catalog
+from app.services.tenant_service import tenant_session
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson"
+}
+
+EVALUATION_COLUMNS = [
+    "evaluation_id", "student_firstname", "student_lastname", "age_years", "age_months",
+    "school", "status", "created_at", "completed_at"
+] + SCORE_COLUMNS + ["calculated_at"]
+
+RESPONSE_COLUMNS = ["evaluation_id", "task_id", "test_type", "item", "category", "response", "created_at"]
+
+def evaluation_export_query(filters: Sequence) -> Select:
+    """Evaluations with their stored scores (blank until calculated), oldest first."""
+    return select(
+        Evaluation.id.label("evaluation_id"),
+        Evaluation.student_firstname,
+        Evaluation.student_lastname,
+        Evaluation.age_years,
+        Evaluation.age_months,
+        Evaluation.school,
+        Evaluation.status,
+        Evaluation.created_at,
+        Evaluation.completed_at,
+        *[getattr(EvaluationScore, column) for column in SCORE_COLUMNS],
+        EvaluationScore.calculated_at
+    ).outerjoin(
+        EvaluationScore, EvaluationScore.evaluation_id == Evaluation.id
+    ).where(*filters).order_by(Evaluation.id)
+
+def response_export_query(filters: Sequence) -> Select:
+    """Responses of the matching evaluations, in (evaluation_id, task_id) order."""
+    return select(
+        EvaluationResponse.evaluation_id,
+        EvaluationResponse.task_id,
+        EvaluationResponse.response,
+        EvaluationResponse.created_at
+    ).join(
+        Evaluation, Evaluation.id == EvaluationResponse.evaluation_id
+    ).where(*filters).order_by(EvaluationResponse.evaluation_id, EvaluationResponse.task_id)
+
+def export_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+async def stream_export_rows(tenant_id: int, dataset: str, filters: Sequence,
+                             batch_size: int = None) -> AsyncIterator[List[Dict]]:
+    """
+    Yield one tenant's export rows in batches straight off a server-side cursor.
+    The generator owns its session because it outlives the request handler.
+    """
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    query = evaluation_export_query(filters) if dataset == "evaluations" else response_export_query(filters)
+
+    async with tenant_session(tenant_id) as db:
+        tasks = {}
+        if dataset == "responses":
+            catalog = await db.run_sync(get_task_catalog)
+            for test_type, task_list in (("oral", catalog.oral_tasks), ("listening", catalog.listening_tasks)):
+                for task in task_list:
+                    tasks[task["id"]] = {"test_type": test_type, "item": task["item"], "category": task["category"]}
+
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.mappings().partitions():
+            rows = []
+            for row in partition:
+                row = {key: export_value(value) for key, value in row.items()}
+                if dataset == "responses":
+                    row.update(tasks.get(row["task_id"], {}))
+                rows.append(row)
+            yield rows
+
+async def encode_csv(columns: List[str], batches: AsyncIterator[List[Dict]]) -> AsyncIterator[str]:
+    """Header first so the client gets bytes immediately, then one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+async def encode_ndjson(columns: List[str], batches: AsyncIterator[List[Dict]]) -> AsyncIterator[str]:
+    async for rows in batches:
+        yield "".join(
+            json.dumps({column: row.get(column) for column in columns}, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+def export_stream(tenant_id: int, dataset: str, export_format: str, filters: Sequence) -> AsyncIterator[str]:
+    columns = EVALUATION_COLUMNS if dataset == "evaluations" else RESPONSE_COLUMNS
+    encode = encode_csv if export_format == "csv" else encode_ndjson
+    return encode(columns, stream_export_rows(tenant_id, dataset, filters))
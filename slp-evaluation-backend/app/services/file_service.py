@@ -1,12 +1,53 @@
+import asyncio
+import hashlib
 import os
+import time
 import uuid
 from pathlib import Path
 from fastapi import UploadFile
+from typing import AsyncIterator, Optional
 import shutil
 
-# Create uploads directory
+# Created on the first upload rather than on import
 UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+UPLOAD_TEMP_MAX_AGE_SECONDS = 3600
+# Finished uploads are kept for this long after they were last uploaded or ingested, then swept.
+# They are shared by content hash, so they can't be deleted as soon as one ingestion finishes.
+UPLOAD_RETENTION_SECONDS = int(os.getenv("UPLOAD_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+# Accepted scan formats, keyed by content type, with their leading magic bytes
+ALLOWED_CONTENT_TYPES = {
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/tiff": (b"II*\x00", b"MM\x00*"),
+    "application/pdf": (b"%PDF-",),
+}
+
+EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/tiff": ".tiff",
+    "application/pdf": ".pdf",
+}
+
+class UploadRejected(Exception):
+    """Raised when an upload fails the size or content type checks."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+class StoredUpload:
+    def __init__(self, path: Path, sha256: str, size: int, content_type: str, duplicate: bool):
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self.content_type = content_type
+        self.duplicate = duplicate
 
 def save_uploaded_file(file: UploadFile, test_type: str) -> str:
     """
@@ -16,6 +57,7 @@ def save_uploaded_file(file: UploadFile, test_type: str) -> str:
     file_extension = Path(file.filename).suffix if file.filename else ""
     unique_filename = f"{test_type}_{uuid.uuid4()}{file_extension}"
     file_path = UPLOAD_DIR / unique_filename
+    UPLOAD_DIR.mkdir(exist_ok=True)
     
     # Save file
     with open(file_path, "wb") as buffer:
@@ -23,9 +65,91 @@ def save_uploaded_file(file: UploadFile, test_type: str) -> str:
     
     return str(file_path)
 
+def check_content_type(content_type: Optional[str]) -> str:
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        raise UploadRejected(415, f"Unsupported content type: {content_type or 'none'}")
+    return content_type
+
+async def save_upload_stream(chunks: AsyncIterator[bytes], test_type: str, content_type: Optional[str],
+                             max_bytes: Optional[int] = None) -> StoredUpload:
+    """
+    Stream an upload to disk in chunks, enforcing size and type as bytes arrive.
+    Files are stored by content hash, so identical uploads are kept only once.
+    """
+    content_type = check_content_type(content_type)
+    max_bytes = max_bytes or UPLOAD_MAX_BYTES
+    temp_path = UPLOAD_DIR / f".{uuid.uuid4()}.part"
+    await asyncio.to_thread(UPLOAD_DIR.mkdir, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    header = b""
+    
+    buffer = await asyncio.to_thread(open, temp_path, "wb")
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadRejected(413, f"Upload exceeds {max_bytes} bytes")
+            
+            # Check the magic bytes as soon as enough of the file has arrived
+            if len(header) < 8:
+                header += chunk[:8 - len(header)]
+                if len(header) >= 8 and not header.startswith(ALLOWED_CONTENT_TYPES[content_type]):
+                    raise UploadRejected(415, f"File contents do not match {content_type}")
+            
+            digest.update(chunk)
+            await asyncio.to_thread(buffer.write, chunk)
+        
+        if not header.startswith(ALLOWED_CONTENT_TYPES[content_type]):
+            raise UploadRejected(415, f"File contents do not match {content_type}")
+    except BaseException:
+        await asyncio.to_thread(buffer.close)
+        await asyncio.to_thread(cleanup_file, str(temp_path))
+        raise
+    await asyncio.to_thread(buffer.close)
+    
+    sha256 = digest.hexdigest()
+    final_path = UPLOAD_DIR / f"{test_type}_{sha256}{EXTENSIONS[content_type]}"
+    duplicate = await asyncio.to_thread(final_path.exists)
+    if duplicate:
+        await asyncio.to_thread(cleanup_file, str(temp_path))
+        await asyncio.to_thread(touch_upload, final_path)
+    else:
+        await asyncio.to_thread(os.replace, temp_path, final_path)
+    
+    return StoredUpload(final_path, sha256, size, content_type, duplicate)
+
 def cleanup_file(file_path: str):
     """Remove uploaded file after processing."""
     try:
         os.remove(file_path)
     except OSError:
-        pass
\ No newline at end of file
+        pass
+
+def touch_upload(path: Path):
+    """Restart an upload's retention period (it was uploaded again, or is about to be ingested)."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def cleanup_stale_uploads(max_age_seconds: int = UPLOAD_TEMP_MAX_AGE_SECONDS,
+                          retention_seconds: int = UPLOAD_RETENTION_SECONDS):
+    """
+    Remove partial uploads left behind by interrupted requests, and finished uploads
+    not uploaded again or ingested within the retention period.
+    """
+    now = time.time()
+    sweeps = [(".*.part", now - max_age_seconds)]
+    if retention_seconds > 0:
+        sweeps.append(("[!.]*", now - retention_seconds))
+    for pattern, cutoff in sweeps:
+        for path in UPLOAD_DIR.glob(pattern):
+            try:
+                if path.is_file() and path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
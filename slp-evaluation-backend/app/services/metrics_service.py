@@ -0,0 +1,288 @@
+import contextvars
+import cProfile
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from sqlalchemy import event
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+# Profiling is only honoured when enabled for the deployment, then per request via X-Profile: 1
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Keep at most this many distinct statements per request for the slow-request breakdown
+MAX_TRACKED_STATEMENTS = 50
+
+class RequestStats:
+    """SQL statements and database time attributed to one request."""
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.breakdown: Dict[str, List] = {}
+
+    def record(self, statement: str, seconds: float):
+        self.statements += 1
+        self.db_seconds += seconds
+        entry = self.breakdown.get(statement)
+        if entry is not None:
+            entry[0] += 1
+            entry[1] += seconds
+        elif len(self.breakdown) < MAX_TRACKED_STATEMENTS:
+            self.breakdown[statement] = [1, seconds]
+
+    def top_statements(self, limit: int = 5) -> List[Tuple[str, int, float]]:
+        ranked = sorted(self.breakdown.items(), key=lambda item: item[1][1], reverse=True)
+        return [(statement, count, seconds) for statement, (count, seconds) in ranked[:limit]]
+
+current_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "current_request_stats", default=None
+)
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a label tuple, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple, value: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts, then sum and count
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in sorted(series):
+            label_text = ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(self.label_names, labels))
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound:g}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            label_text = ",".join(f'{name}="{escape_label(v)}"' for name, v in zip(self.label_names, labels))
+            lines.append(f"{self.name}{{{label_text}}} {value:g}")
+        return lines
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+REQUEST_LABELS = ("method", "route", "status")
+
+request_latency = Histogram(
+    "http_request_duration_seconds", "Time from request start to the last body byte.", REQUEST_LABELS, LATENCY_BUCKETS
+)
+request_statements = Histogram(
+    "http_request_sql_statements", "SQL statements executed per request.", REQUEST_LABELS, STATEMENT_BUCKETS
+)
+request_db_seconds = Counter(
+    "http_request_db_seconds_total", "Time spent executing SQL, summed over requests.", REQUEST_LABELS
+)
+slow_requests = Counter(
+    "http_slow_requests_total", f"Requests slower than SLOW_REQUEST_MS ({SLOW_REQUEST_MS:g} ms).", ("method", "route")
+)
+
+_instrumented_engines = []
+
+_engine_pools = {}
+
+def instrument_engine(engine, pool: str = "default"):
+    """Attribute every statement run on engine (sync or async) to the current request."""
+    engine = getattr(engine, "sync_engine", engine)
+    if engine in _instrumented_engines:
+        return
+    _instrumented_engines.append(engine)
+    _engine_pools[engine] = pool
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_request_stats.get() is not None:
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_request_stats.get()
+        started = conn.info.get("query_started")
+        if stats is not None and started:
+            stats.record(statement, time.perf_counter() - started.pop())
+
+def render_metrics() -> str:
+    lines = []
+    for metric in (request_latency, request_statements, request_db_seconds, slow_requests):
+        lines.extend(metric.render())
+    lines.append("# HELP db_pool_checked_out Connections currently checked out of the pool.")
+    lines.append("# TYPE db_pool_checked_out gauge")
+    for engine in _instrumented_engines:
+        checked_out = getattr(engine.pool, "checkedout", None)
+        if checked_out:
+            lines.append(
+                f'db_pool_checked_out{{engine="{escape_label(engine.url.drivername)}",'
+                f'pool="{escape_label(_engine_pools[engine])}"}} {checked_out()}'
+            )
+    return "\n".join(lines) + "\n"
+
+def route_template(scope) -> str:
+    """The matched route's path template, so label values stay bounded."""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    path = scope["path"]
+    regex = getattr(route, "path_regex", None)
+    if regex is None or regex.match(path):
+        return template
+    # Some FastAPI versions report an included route's own path; recover the router prefix from the URL
+    for i in range(1, len(path)):
+        if path[i] == "/" and regex.match(path[i:]):
+            return path[:i] + template
+    return template
+
+def one_line(statement: str, limit: int = 200) -> str:
+    statement = re.sub(r"\s+", " ", statement).strip()
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+_profile_lock = threading.Lock()
+
+class Profiler:
+    """Per-request profile: pyinstrument when installed (async-aware), otherwise cProfile."""
+
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler as PyinstrumentProfiler
+            self._profiler = PyinstrumentProfiler(async_mode="enabled")
+            self.extension = "html"
+        except ImportError:
+            # cProfile sees the whole event loop thread, so concurrent requests show up too
+            self._profiler = cProfile.Profile()
+            self.extension = "prof"
+
+    def start(self):
+        if isinstance(self._profiler, cProfile.Profile):
+            self._profiler.enable()
+        else:
+            self._profiler.start()
+
+    def stop(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(self._profiler, cProfile.Profile):
+            self._profiler.disable()
+            self._profiler.dump_stats(str(path))
+        else:
+            self._profiler.stop()
+            path.write_text(self._profiler.output_html())
+
+class InstrumentationMiddleware:
+    """
+    ASGI middleware recording latency, SQL statement count and DB time per route.
+    Timing covers the whole response, including streamed bodies.
+    """
+
+    def __init__(self, app, exclude_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        profiler = None
+        profile_path = None
+        headers = dict(scope.get("headers") or [])
+        if PROFILING_ENABLED and headers.get(b"x-profile") == b"1" and _profile_lock.acquire(blocking=False):
+            profiler = Profiler()
+            profile_path = PROFILE_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(3).hex()}.{profiler.extension}"
+            profiler.start()
+
+        event_stream = False
+
+        async def send_wrapper(message):
+            nonlocal status, event_stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                event_stream = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", [])
+                )
+                if profile_path is not None:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-profile-file", profile_path.name.encode("ascii"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_stats.reset(token)
+            if profiler is not None:
+                try:
+                    profiler.stop(profile_path)
+                finally:
+                    _profile_lock.release()
+
+            route_path = route_template(scope)
+            labels = (scope["method"], route_path, str(status))
+            request_latency.observe(labels, elapsed)
+            request_statements.observe(labels, stats.statements)
+            request_db_seconds.inc(labels, stats.db_seconds)
+
+            # Event streams stay open by design, so their duration says nothing about speed
+            if elapsed * 1000 >= SLOW_REQUEST_MS and not event_stream:
+                slow_requests.inc((scope["method"], route_path))
+                breakdown = "".join(
+                    f"\n  {count}x {seconds * 1000:.1f}ms {one_line(statement)}"
+                    for statement, count, seconds in stats.top_statements()
+                )
+                logger.warning(
+                    "Slow request %s %s -> %s in %.1fms (%d SQL statements, %.1fms in DB)%s",
+                    scope["method"], scope["path"], status, elapsed * 1000,
+                    stats.statements, stats.db_seconds * 1000, breakdown
+                )
@@ -0,0 +1,212 @@
+import csv
+from typing import Dict, Iterable, Iterator, List, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.models.models import TableA1LC, TableA1OE, TableA2
+from app.services.cache_service import bump_cache_version
+
+IMPORT_BATCH_SIZE = 5000
+
+class NormImportError(Exception):
+    """Raised when a norm table CSV is malformed or its grid is incomplete."""
+
+    def __init__(self, table: str, problems: List[str]):
+        super().__init__(f"{table}: " + "; ".join(problems[:10]))
+        self.table = table
+        self.problems = problems
+
+class NormTableSpec:
+    def __init__(self, model, int_columns: List[str], text_columns: List[str]):
+        self.model = model
+        self.table = model.__tablename__
+        self.int_columns = int_columns
+        self.text_columns = text_columns
+        self.columns = int_columns + text_columns
+
+GRID_SPEC = ["age_years", "age_months", "raw_score", "standard_score"], ["percentile_rank"]
+
+NORM_TABLES = {
+    "lc": NormTableSpec(TableA1LC, *GRID_SPEC),
+    "oe": NormTableSpec(TableA1OE, *GRID_SPEC),
+    "composite": NormTableSpec(TableA2, ["sum_standard_scores", "composite_standard_score"], ["composite_percentile_rank"]),
+}
+
+class GridValidator:
+    """Checks that a Table A1 covers every month between its first and last age with one shared raw-score range."""
+
+    def __init__(self):
+        self.raw_scores: Dict[Tuple[int, int], set] = {}
+        self.problems: List[str] = []
+
+    def add(self, row: Tuple, line: int):
+        age_years, age_months, raw_score = row[0], row[1], row[2]
+        if not 0 <= age_months <= 11:
+            self.problems.append(f"line {line}: age_months {age_months} out of range")
+        seen = self.raw_scores.setdefault((age_years, age_months), set())
+        if raw_score in seen:
+            self.problems.append(f"line {line}: duplicate row for age {age_years};{age_months} raw score {raw_score}")
+        seen.add(raw_score)
+
+    def finish(self) -> List[str]:
+        if not self.raw_scores:
+            return self.problems + ["table is empty"]
+        ages = sorted(self.raw_scores)
+        first, last = ages[0][0] * 12 + ages[0][1], ages[-1][0] * 12 + ages[-1][1]
+        missing_ages = [f"{m // 12};{m % 12}" for m in range(first, last + 1) if (m // 12, m % 12) not in self.raw_scores]
+        if missing_ages:
+            self.problems.append(f"missing ages {', '.join(missing_ages[:10])}")
+        low = min(min(scores) for scores in self.raw_scores.values())
+        high = max(max(scores) for scores in self.raw_scores.values())
+        expected = set(range(low, high + 1))
+        for (age_years, age_months), scores in sorted(self.raw_scores.items()):
+            if scores != expected:
+                gaps = sorted(expected - scores)
+                self.problems.append(f"age {age_years};{age_months} is missing raw scores {gaps[:10]}")
+        return self.problems
+
+class CompositeValidator:
+    """Checks that Table A2 has exactly one row for every sum in its range."""
+
+    def __init__(self):
+        self.sums = set()
+        self.problems: List[str] = []
+
+    def add(self, row: Tuple, line: int):
+        if row[0] in self.sums:
+            self.problems.append(f"line {line}: duplicate row for sum {row[0]}")
+        self.sums.add(row[0])
+
+    def finish(self) -> List[str]:
+        if not self.sums:
+            return self.problems + ["table is empty"]
+        gaps = sorted(set(range(min(self.sums), max(self.sums) + 1)) - self.sums)
+        if gaps:
+            self.problems.append(f"missing sums {gaps[:10]}")
+        return self.problems
+
+def read_norm_csv(path: str, spec: NormTableSpec, validator) -> Iterator[Tuple]:
+    """
+    Stream typed rows from a CSV, feeding each one to the validator.
+    The header is checked before returning, so a wrong file fails before any loading starts.
+    """
+    csv_file = open(path, newline="", encoding="utf-8-sig")
+    reader = csv.DictReader(csv_file)
+    missing = [column for column in spec.columns if column not in (reader.fieldnames or [])]
+    if missing:
+        csv_file.close()
+        raise NormImportError(spec.table, [f"missing columns: {', '.join(missing)}"])
+    return _typed_rows(csv_file, reader, spec, validator)
+
+def _typed_rows(csv_file, reader: csv.DictReader, spec: NormTableSpec, validator) -> Iterator[Tuple]:
+    with csv_file:
+        for line, record in enumerate(reader, start=2):
+            try:
+                row = tuple(int(record[column]) for column in spec.int_columns)
+            except (TypeError, ValueError):
+                validator.problems.append(f"line {line}: non-integer value")
+                continue
+            texts = tuple((record[column] or "").strip() for column in spec.text_columns)
+            if any(not value or len(value) > 10 for value in texts):
+                validator.problems.append(f"line {line}: percentile rank must be 1-10 characters")
+                continue
+            validator.add(row, line)
+            yield row + texts
+
+class _CsvStream:
+    """File-like view over rows, for feeding COPY ... FROM STDIN without buffering the table."""
+
+    def __init__(self, rows: Iterable[Tuple]):
+        self._rows = iter(rows)
+        self._buffer = ""
+        self.count = 0
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                row = next(self._rows)
+            except StopIteration:
+                break
+            self.count += 1
+            self._buffer += ",".join(_csv_field(value) for value in row) + "\n"
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    readline = read
+
+def _csv_field(value) -> str:
+    value = str(value)
+    if any(c in value for c in ',"\n\r'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def _copy_into_staging(conn: Connection, spec: NormTableSpec, rows: Iterable[Tuple]) -> int:
+    staging = f"{spec.table}_import"
+    columns = ", ".join(spec.columns)
+    conn.execute(text(f"CREATE TEMP TABLE {staging} (LIKE {spec.table} INCLUDING DEFAULTS) ON COMMIT DROP"))
+    copy_sql = f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv)"
+    stream = _CsvStream(rows)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            # psycopg2
+            cursor.copy_expert(copy_sql, stream)
+        else:
+            # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                while True:
+                    chunk = stream.read(65536)
+                    if not chunk:
+                        break
+                    copy.write(chunk)
+    finally:
+        cursor.close()
+    return stream.count
+
+def _insert_batches(conn: Connection, spec: NormTableSpec, rows: Iterable[Tuple], batch_size: int) -> int:
+    table = spec.model.__table__
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(dict(zip(spec.columns, row)))
+        if len(batch) >= batch_size:
+            conn.execute(table.insert(), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        conn.execute(table.insert(), batch)
+        count += len(batch)
+    return count
+
+def import_norm_tables(conn: Connection, sources: Dict[str, str], batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Replace the given norm tables ({"lc" | "oe" | "composite": csv_path}) inside the caller's transaction.
+    On PostgreSQL rows are COPYed into a staging table first; the live table is only emptied
+    and refilled after every file has validated, so concurrent readers keep seeing the old
+    rows until commit. Raises NormImportError (and loads nothing) if any file is invalid.
+    Running API workers reload their norms once the transaction commits.
+    """
+    postgres = conn.dialect.name == "postgresql"
+    counts = {}
+    for key, path in sources.items():
+        spec = NORM_TABLES[key]
+        validator = CompositeValidator() if key == "composite" else GridValidator()
+        rows = read_norm_csv(path, spec, validator)
+        if postgres:
+            counts[key] = _copy_into_staging(conn, spec, rows)
+        else:
+            conn.execute(spec.model.__table__.delete())
+            counts[key] = _insert_batches(conn, spec, rows, batch_size)
+        problems = validator.finish()
+        if problems:
+            raise NormImportError(spec.table, problems)
+
+    if postgres:
+        for key in sources:
+            spec = NORM_TABLES[key]
+            columns = ", ".join(spec.columns)
+            conn.execute(text(f"DELETE FROM {spec.table}"))
+            conn.execute(text(f"INSERT INTO {spec.table} ({columns}) SELECT {columns} FROM {spec.table}_import"))
+    bump_cache_version(conn, "norms")
+    return counts
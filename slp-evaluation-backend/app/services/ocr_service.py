@@ -0,0 +1,271 @@
+"""
+OCR ingestion of scanned OWLS-II score sheets.
+
+Each item row on a sheet is expected to carry its item label (e.g. "A12") at the
+left, followed by two checkboxes: the first marks a correct response, the second
+an incorrect one. Rows with neither or both boxes marked are reported as unresolved.
+"""
+import asyncio
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 1)))
+
+# Checkbox geometry, relative to a page normalised to NORMALISED_WIDTH pixels
+NORMALISED_WIDTH = 1700
+CHECKBOX_MIN_SIZE = 18
+CHECKBOX_MAX_SIZE = 70
+CHECKBOX_FILL_THRESHOLD = 0.25
+
+ITEM_LABEL_PATTERN = re.compile(r"\b([A-Z])\s*(\d{1,3})\b")
+# A queued or running job that hasn't updated for this long is reported as interrupted
+INGESTION_STALE_SECONDS = int(os.getenv("INGESTION_STALE_SECONDS", "900"))
+INGESTION_JOB_RETENTION_SECONDS = int(os.getenv("INGESTION_JOB_RETENTION_SECONDS", str(30 * 24 * 3600)))
+
+def _load_grayscale(path: str):
+    import cv2
+
+    image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise ValueError(f"Could not read image: {path}")
+    scale = NORMALISED_WIDTH / image.shape[1]
+    return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+def deskew(gray):
+    """Rotate the page so that printed rows are horizontal."""
+    import cv2
+
+    binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+    points = cv2.findNonZero(binary)
+    if points is None:
+        return gray
+    angle = cv2.minAreaRect(points)[-1]
+    # The reported angle range differs between OpenCV versions; fold it to the smallest correction
+    if angle > 45:
+        angle -= 90
+    elif angle < -45:
+        angle += 90
+    if abs(angle) < 0.1:
+        return gray
+    rows, cols = gray.shape
+    matrix = cv2.getRotationMatrix2D((cols / 2, rows / 2), angle, 1.0)
+    return cv2.warpAffine(gray, matrix, (cols, rows), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+def threshold(gray):
+    import cv2
+
+    return cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 31, 15
+    )
+
+def find_checkboxes(binary) -> List[Tuple[int, int, int, int, bool]]:
+    """Locate square checkbox outlines and whether each one is marked."""
+    import cv2
+
+    contours = cv2.findContours(binary, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)[0]
+    boxes = []
+    for contour in contours:
+        approx = cv2.approxPolyDP(contour, 0.05 * cv2.arcLength(contour, True), True)
+        if len(approx) != 4:
+            continue
+        x, y, w, h = cv2.boundingRect(approx)
+        if not (CHECKBOX_MIN_SIZE <= w <= CHECKBOX_MAX_SIZE and CHECKBOX_MIN_SIZE <= h <= CHECKBOX_MAX_SIZE):
+            continue
+        if not 0.8 <= w / h <= 1.25:
+            continue
+        # A printed box outline fills its bounding rectangle; letters like "A" or "D" do not
+        if cv2.contourArea(contour) < 0.75 * w * h:
+            continue
+        # Outer and inner edges of one printed box are both contours; keep the outer one
+        cx, cy = x + w / 2, y + h / 2
+        duplicate = next((i for i, b in enumerate(boxes) if abs(b[0] + b[2] / 2 - cx) < w / 2 and abs(b[1] + b[3] / 2 - cy) < h / 2), None)
+        if duplicate is not None:
+            if w * h > boxes[duplicate][2] * boxes[duplicate][3]:
+                boxes[duplicate] = (x, y, w, h)
+            continue
+        boxes.append((x, y, w, h))
+
+    checkboxes = []
+    for x, y, w, h in boxes:
+        # Measure ink inside the box, ignoring its printed border
+        margin_x, margin_y = max(2, w // 5), max(2, h // 5)
+        interior = binary[y + margin_y:y + h - margin_y, x + margin_x:x + w - margin_x]
+        fill = cv2.countNonZero(interior) / float(interior.size or 1)
+        checkboxes.append((x, y, w, h, fill >= CHECKBOX_FILL_THRESHOLD))
+    return checkboxes
+
+def group_rows(checkboxes: List[Tuple[int, int, int, int, bool]]) -> List[List[Tuple[int, int, int, int, bool]]]:
+    """Group checkboxes into printed rows, top to bottom, each sorted left to right."""
+    rows = []
+    for box in sorted(checkboxes, key=lambda b: b[1] + b[3] / 2):
+        center = box[1] + box[3] / 2
+        if rows and abs(center - (rows[-1][0][1] + rows[-1][0][3] / 2)) < box[3] / 2:
+            rows[-1].append(box)
+        else:
+            rows.append([box])
+    return [sorted(row, key=lambda b: b[0]) for row in rows]
+
+def read_item_label(gray, row: List[Tuple[int, int, int, int, bool]]) -> Optional[str]:
+    """OCR the item label printed to the left of a row's first checkbox."""
+    import pytesseract
+
+    x, y, w, h, _ = row[0]
+    pad = h // 2
+    crop = gray[max(0, y - pad):y + h + pad, 0:max(1, x - 4)]
+    text = pytesseract.image_to_string(crop, config="--psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+    match = ITEM_LABEL_PATTERN.search(text.upper())
+    return f"{match.group(1)}{match.group(2)}" if match else None
+
+def process_sheet(path: str) -> Dict:
+    """
+    Read one scanned sheet. Runs in a worker process, so it takes and returns plain data:
+    {"items": {item: "correct" | "incorrect"}, "unresolved": [row labels or indexes]}.
+    """
+    gray = deskew(_load_grayscale(path))
+    rows = group_rows(find_checkboxes(threshold(gray)))
+
+    items = {}
+    unresolved = []
+    for index, row in enumerate(rows):
+        label = read_item_label(gray, row)
+        if not label or len(row) < 2:
+            unresolved.append(label or f"row {index + 1}")
+            continue
+        correct_marked, incorrect_marked = row[0][4], row[1][4]
+        if correct_marked == incorrect_marked:
+            unresolved.append(label)
+            continue
+        items[label] = "correct" if correct_marked else "incorrect"
+    return {"items": items, "unresolved": unresolved}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_ocr_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS)
+        return _pool
+
+def shutdown_ocr_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def describe_ingestion_job(job) -> Dict:
+    return {
+        "job_id": job.id,
+        "evaluation_id": job.evaluation_id,
+        "status": job.status,
+        "sheets": len(job.sheets),
+        "processed": job.processed,
+        "saved": job.saved,
+        "unresolved": job.unresolved,
+        "errors": job.errors,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+async def create_ingestion_job(db, evaluation_id: int, sheets: List[Tuple[str, str]]):
+    """Record a queued job in the caller's tenant session, pruning that tenant's old finished jobs."""
+    from sqlalchemy import delete
+    from app.models.models import IngestionJob
+
+    cutoff = datetime.utcnow() - timedelta(seconds=INGESTION_JOB_RETENTION_SECONDS)
+    await db.execute(delete(IngestionJob).where(IngestionJob.finished_at < cutoff))
+    job = IngestionJob(id=uuid.uuid4().hex, evaluation_id=evaluation_id, sheets=[list(sheet) for sheet in sheets])
+    db.add(job)
+    await db.commit()
+    return job
+
+async def get_ingestion_job(db, job_id: str):
+    """
+    Load a job of the session's tenant. Jobs are run by the worker that accepted them; one that
+    hasn't made progress for INGESTION_STALE_SECONDS (its worker restarted or died) is failed.
+    """
+    from sqlalchemy import select
+    from app.models.models import IngestionJob
+
+    job = (await db.execute(select(IngestionJob).where(IngestionJob.id == job_id))).scalars().first()
+    now = datetime.utcnow()
+    if job and job.status in ("queued", "running") and job.updated_at < now - timedelta(seconds=INGESTION_STALE_SECONDS):
+        job.status = "failed"
+        job.errors = {**job.errors, "job": f"Interrupted: no progress for {INGESTION_STALE_SECONDS} seconds"}
+        job.updated_at = job.finished_at = now
+        await db.commit()
+    return job
+
+async def run_ingestion_job(tenant_id: int, job_id: str):
+    """OCR every sheet of a job in parallel, then save all marks with one bulk upsert."""
+    # Imported here so OCR worker processes never load the database layer
+    from app.models.models import IngestionJob, ResponseEnum
+    from app.services.catalog_service import get_task_catalog
+    from app.services.response_service import apply_responses
+    from app.services.tenant_service import tenant_session
+
+    loop = asyncio.get_running_loop()
+    pool = get_ocr_pool()
+
+    async def run_sheet(path: str, test_type: str):
+        try:
+            return test_type, path, await loop.run_in_executor(pool, process_sheet, path), None
+        except Exception as e:
+            return test_type, path, None, str(e)
+
+    async with tenant_session(tenant_id) as db:
+        job = await db.get(IngestionJob, job_id)
+        if job is None:
+            return
+        errors: Dict[str, str] = {}
+        unresolved_by_sheet: Dict[str, List[str]] = {}
+        job.status = "running"
+        job.updated_at = datetime.utcnow()
+        await db.commit()
+
+        # Record progress as each sheet finishes, so any worker can report it
+        results = []
+        for finished in asyncio.as_completed([run_sheet(path, test_type) for path, test_type in job.sheets]):
+            test_type, path, result, error = await finished
+            if error is not None:
+                errors[Path(path).name] = error
+            results.append((test_type, path, result))
+            job.processed += 1
+            job.errors = dict(errors)
+            job.updated_at = datetime.utcnow()
+            await db.commit()
+
+        try:
+            catalog = await db.run_sync(get_task_catalog)
+            responses = {}
+            for test_type, path, result in results:
+                if result is None:
+                    continue
+                unresolved = list(result["unresolved"])
+                for item, value in result["items"].items():
+                    task_id = catalog.task_ids_by_item.get((test_type, item))
+                    if task_id is None:
+                        unresolved.append(item)
+                        continue
+                    responses[task_id] = ResponseEnum.CORRECT if value == "correct" else ResponseEnum.INCORRECT
+                if unresolved:
+                    unresolved_by_sheet[Path(path).name] = unresolved
+
+            job.saved = len(await db.run_sync(apply_responses, job.evaluation_id, responses))
+            job.status = "failed" if errors and not job.saved else "completed"
+        except Exception as e:
+            await db.rollback()
+            errors["save"] = str(e)
+            job.status = "failed"
+        job.unresolved = unresolved_by_sheet
+        job.errors = errors
+        job.updated_at = job.finished_at = datetime.utcnow()
+        await db.commit()
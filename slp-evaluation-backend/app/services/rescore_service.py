@@ -0,0 +1,134 @@
+from sqlalchemy import select, func, case, and_, or_
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.models import (
+    TableA1LC, TableA1OE, TableA2, Evaluation, EvaluationResponse, EvaluationScore,
+    Task, TestType, ResponseEnum, StatusEnum
+)
+from app.services.calculation_service import SCORE_COLUMNS
+from typing import Dict, List, Optional, Tuple
+
+def rescore_target_filter(tenant_id: Optional[int] = None):
+    """Completed evaluations, plus any evaluation that already has stored scores; optionally one tenant's."""
+    target = or_(Evaluation.status == StatusEnum.COMPLETED, EvaluationScore.evaluation_id.isnot(None))
+    return target if tenant_id is None else and_(Evaluation.tenant_id == tenant_id, target)
+
+def join_scores():
+    return and_(EvaluationScore.tenant_id == Evaluation.tenant_id, EvaluationScore.evaluation_id == Evaluation.id)
+
+def count_rescore_targets(db: Session, after_id: int = 0, tenant_id: Optional[int] = None) -> int:
+    return db.scalar(
+        select(func.count(Evaluation.id)).outerjoin(
+            EvaluationScore, join_scores()
+        ).where(Evaluation.id > after_id, rescore_target_filter(tenant_id))
+    )
+
+def score_chunk_query(after_id: int, chunk_size: int, tenant_id: Optional[int] = None):
+    """
+    Scores for the next chunk_size target evaluations after after_id, in id order.
+    Raw counts come from one grouped query over the chunk's responses and are joined
+    against Table A1 (both tests) and Table A2 in the same statement.
+    """
+    chunk = select(
+        Evaluation.tenant_id, Evaluation.id, Evaluation.age_years, Evaluation.age_months
+    ).outerjoin(
+        EvaluationScore, join_scores()
+    ).where(
+        Evaluation.id > after_id, rescore_target_filter(tenant_id)
+    ).order_by(Evaluation.id).limit(chunk_size).subquery("chunk")
+
+    def correct_for(test_type: str):
+        return func.coalesce(func.sum(case(
+            (and_(TestType.name == test_type, EvaluationResponse.response == ResponseEnum.CORRECT), 1),
+            else_=0
+        )), 0)
+
+    raw = select(
+        chunk.c.tenant_id,
+        chunk.c.id.label("evaluation_id"),
+        chunk.c.age_years,
+        chunk.c.age_months,
+        correct_for("listening").label("listening_raw_score"),
+        correct_for("oral").label("oral_raw_score")
+    ).select_from(chunk).outerjoin(
+        EvaluationResponse, and_(
+            EvaluationResponse.tenant_id == chunk.c.tenant_id, EvaluationResponse.evaluation_id == chunk.c.id
+        )
+    ).outerjoin(
+        Task, Task.id == EvaluationResponse.task_id
+    ).outerjoin(
+        TestType, TestType.id == Task.test_type_id
+    ).group_by(chunk.c.tenant_id, chunk.c.id, chunk.c.age_years, chunk.c.age_months).subquery("raw")
+
+    lc = aliased(TableA1LC)
+    oe = aliased(TableA1OE)
+    a2 = aliased(TableA2)
+    return select(
+        raw.c.tenant_id,
+        raw.c.evaluation_id,
+        raw.c.listening_raw_score,
+        lc.standard_score.label("listening_standard_score"),
+        lc.percentile_rank.label("listening_percentile_rank"),
+        raw.c.oral_raw_score,
+        oe.standard_score.label("oral_standard_score"),
+        oe.percentile_rank.label("oral_percentile_rank"),
+        (lc.standard_score + oe.standard_score).label("sum_standard_scores"),
+        a2.composite_standard_score,
+        a2.composite_percentile_rank
+    ).select_from(raw).outerjoin(
+        lc, and_(
+            lc.age_years == raw.c.age_years,
+            lc.age_months == raw.c.age_months,
+            lc.raw_score == raw.c.listening_raw_score
+        )
+    ).outerjoin(
+        oe, and_(
+            oe.age_years == raw.c.age_years,
+            oe.age_months == raw.c.age_months,
+            oe.raw_score == raw.c.oral_raw_score
+        )
+    ).outerjoin(
+        a2, a2.sum_standard_scores == lc.standard_score + oe.standard_score
+    ).order_by(raw.c.evaluation_id)
+
+def write_scores(db: Session, rows: List[Dict]):
+    """Bulk upsert score rows into evaluation_scores; does not commit."""
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(EvaluationScore)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EvaluationScore.tenant_id, EvaluationScore.evaluation_id],
+            set_={
+                **{column: stmt.excluded[column] for column in SCORE_COLUMNS},
+                "calculated_at": func.now(),
+                "updated_at": func.now()
+            }
+        )
+        db.execute(stmt, rows)
+    else:
+        existing = set(db.scalars(select(EvaluationScore.evaluation_id).where(
+            EvaluationScore.evaluation_id.in_([row["evaluation_id"] for row in rows])
+        )))
+        updates = [row for row in rows if row["evaluation_id"] in existing]
+        inserts = [row for row in rows if row["evaluation_id"] not in existing]
+        if updates:
+            db.bulk_update_mappings(EvaluationScore, updates)
+        if inserts:
+            db.bulk_insert_mappings(EvaluationScore, inserts)
+
+def rescore_chunk(db: Session, after_id: int, chunk_size: int, tenant_id: Optional[int] = None) -> Tuple[int, int, int]:
+    """
+    Re-score the next chunk of evaluations after after_id (of one tenant, or all); does not commit.
+    Returns (last evaluation id, evaluations rescored, evaluations without a composite score).
+    """
+    rows = [dict(row) for row in db.execute(score_chunk_query(after_id, chunk_size, tenant_id)).mappings()]
+    if not rows:
+        return after_id, 0, 0
+
+    write_scores(db, rows)
+    unscored = sum(1 for row in rows if row["composite_standard_score"] is None)
+    return rows[-1]["evaluation_id"], len(rows), unscored
@@ -0,0 +1,147 @@
+import asyncio
+import os
+from typing import Dict, Optional, Set, Tuple
+
+from app.models.models import ResponseEnum
+from app.services.response_service import apply_responses
+from app.services.tenant_service import tenant_session
+
+# During a burst (a write within this long of the previous one for the same evaluation) writes
+# wait this long for more before their transaction starts; an isolated write goes straight through
+RESPONSE_COALESCE_MS = float(os.getenv("RESPONSE_COALESCE_MS", "50"))
+
+# Bound on remembered last-write times; older entries are dropped once it is exceeded
+MAX_TRACKED_EVALUATIONS = 10000
+
+class PendingResponses:
+    """Writes for one evaluation merged into a single upcoming transaction."""
+
+    def __init__(self):
+        self.responses: Dict[int, ResponseEnum] = {}
+        self.sequences: Dict[int, int] = {}
+        self.owners: Dict[int, object] = {}
+        # Set when the batch had to be split: the error of each request whose own writes failed
+        self.errors: Dict[object, Exception] = {}
+        self.done = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting any more (cancelled requests); don't warn about unretrieved errors
+        self.done.add_done_callback(lambda future: future.cancelled() or future.exception())
+
+    def merge(self, responses: Dict[int, ResponseEnum], sequences: Dict[int, int], owner: object):
+        for task_id, response in responses.items():
+            sequence = sequences.get(task_id)
+            held = self.sequences.get(task_id)
+            # Same rule as the database: a sequenced write never replaces a newer one
+            if task_id in self.responses and sequence is not None and held is not None and sequence <= held:
+                continue
+            self.responses[task_id] = response
+            self.owners[task_id] = owner
+            if sequence is None:
+                self.sequences.pop(task_id, None)
+            else:
+                self.sequences[task_id] = sequence
+
+    def split(self) -> Dict[object, Tuple[Dict[int, ResponseEnum], Dict[int, int]]]:
+        """The writes each request still owns, as that request's (responses, sequences)."""
+        requests = {}
+        for task_id, owner in self.owners.items():
+            responses, sequences = requests.setdefault(owner, ({}, {}))
+            responses[task_id] = self.responses[task_id]
+            if task_id in self.sequences:
+                sequences[task_id] = self.sequences[task_id]
+        return requests
+
+# Batches are per (tenant_id, evaluation_id): a tenant's writes never join another tenant's
+# transaction, even for an evaluation id the other tenant owns
+BufferKey = Tuple[int, int]
+
+class ResponseWriteBuffer:
+    """
+    Coalesces bursts of response writes per evaluation: writes arriving within the window,
+    or while that evaluation's previous transaction is still running, share one transaction.
+    A task toggled several times in a burst is written once, with its latest value.
+    """
+
+    def __init__(self, window_seconds: float = RESPONSE_COALESCE_MS / 1000):
+        self.window_seconds = window_seconds
+        self._pending: Dict[BufferKey, PendingResponses] = {}
+        self._flushing: Dict[BufferKey, asyncio.Task] = {}
+        self._last_write: Dict[BufferKey, float] = {}
+
+    def _delay(self, key: BufferKey) -> float:
+        now = asyncio.get_running_loop().time()
+        last = self._last_write.get(key)
+        self._last_write[key] = now
+        if len(self._last_write) > MAX_TRACKED_EVALUATIONS:
+            cutoff = now - self.window_seconds
+            self._last_write = {key: value for key, value in self._last_write.items() if value >= cutoff}
+        return self.window_seconds if last is not None and now - last < self.window_seconds else 0
+
+    async def submit(self, tenant_id: int, evaluation_id: int, responses: Dict[int, ResponseEnum],
+                     sequences: Optional[Dict[int, int]] = None) -> Set[int]:
+        """
+        Queue writes and wait for their commit on the tenant's pool; returns which of these
+        task ids were written.
+        """
+        key = (tenant_id, evaluation_id)
+        delay = self._delay(key)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = PendingResponses()
+            previous = self._flushing.get(key)
+            self._flushing[key] = asyncio.get_running_loop().create_task(
+                self._flush(key, batch, previous, delay)
+            )
+        owner = object()
+        batch.merge(responses, sequences or {}, owner)
+
+        # Shielded: a client hanging up must not cancel a transaction other writes share
+        applied = await asyncio.shield(batch.done)
+        if owner in batch.errors:
+            raise batch.errors[owner]
+        return {task_id for task_id in responses if batch.owners.get(task_id) is owner and task_id in applied}
+
+    async def drain(self):
+        """Wait until every queued write is committed; used on shutdown."""
+        while self._flushing:
+            await asyncio.wait(list(self._flushing.values()))
+
+    async def _flush(self, key: BufferKey, batch: PendingResponses, previous: Optional[asyncio.Task], delay: float):
+        # Even without a delay, yield once so writes from the same instant join this batch
+        await asyncio.sleep(delay)
+        # One transaction per evaluation at a time; this batch keeps filling while it waits
+        if previous is not None:
+            await asyncio.wait([previous])
+        del self._pending[key]
+        tenant_id, evaluation_id = key
+
+        try:
+            try:
+                applied = await self._apply(tenant_id, evaluation_id, batch.responses, batch.sequences)
+            except Exception:
+                requests = batch.split()
+                if len(requests) < 2:
+                    raise
+                # One request's bad write (e.g. an unknown task) must not fail the others it shared
+                # the transaction with: give each request a transaction of its own
+                applied = set()
+                for owner, (responses, sequences) in requests.items():
+                    try:
+                        applied |= await self._apply(tenant_id, evaluation_id, responses, sequences)
+                    except Exception as e:
+                        batch.errors[owner] = e
+        except Exception as e:
+            batch.done.set_exception(e)
+        else:
+            batch.done.set_result(applied)
+        finally:
+            if self._flushing.get(key) is asyncio.current_task():
+                del self._flushing[key]
+
+    async def _apply(self, tenant_id: int, evaluation_id: int, responses: Dict[int, ResponseEnum],
+                     sequences: Dict[int, int]) -> Set[int]:
+        async with tenant_session(tenant_id) as db:
+            applied = await db.run_sync(apply_responses, evaluation_id, responses, sequences)
+            await db.commit()
+        return applied
+
+response_buffer = ResponseWriteBuffer()
@@ -0,0 +1,158 @@
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.models import Evaluation, EvaluationResponse, EvaluationScore, ResponseEnum
+from app.services.calculation_service import apply_raw_score_deltas
+from app.services.catalog_service import get_task_catalog
+from app.services.events_service import publish_event, wants_events
+from app.services.tenant_service import evaluation_tenant_id
+from typing import Dict, Iterable, Optional, Set
+
+class ResponseTargetNotFound(Exception):
+    """The evaluation is not in the session's tenant, or some task ids are not in the catalog."""
+
+    def __init__(self, evaluation_id: int, task_ids: Iterable[int] = ()):
+        self.evaluation_id = evaluation_id
+        self.task_ids = sorted(task_ids)
+        if self.task_ids:
+            super().__init__(f"Unknown task ids: {', '.join(map(str, self.task_ids))}")
+        else:
+            super().__init__(f"Evaluation {evaluation_id} not found")
+
+def upsert_responses(db: Session, evaluation_id: int, responses: Dict[int, ResponseEnum],
+                     sequences: Optional[Dict[int, int]] = None) -> Set[int]:
+    """
+    Insert or update responses for an evaluation in a single statement.
+    A write whose sequence number is not above the stored one is stale and skipped;
+    writes without a sequence always apply. Relies on the unique (tenant_id, evaluation_id, task_id)
+    constraint; does not commit. Returns the task ids actually written.
+    """
+    if not responses:
+        return set()
+
+    sequences = sequences or {}
+    tenant_id = evaluation_tenant_id(db, evaluation_id)
+    rows = [
+        {
+            "tenant_id": tenant_id, "evaluation_id": evaluation_id, "task_id": task_id,
+            "response": response, "sequence": sequences.get(task_id)
+        }
+        for task_id, response in responses.items()
+    ]
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(EvaluationResponse).values(rows)
+        stored = EvaluationResponse.__table__.c.sequence
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EvaluationResponse.tenant_id, EvaluationResponse.evaluation_id, EvaluationResponse.task_id],
+            set_={"response": stmt.excluded.response, "sequence": func.coalesce(stmt.excluded.sequence, stored)},
+            where=or_(stmt.excluded.sequence.is_(None), stored.is_(None), stmt.excluded.sequence > stored)
+        ).returning(EvaluationResponse.task_id)
+        return set(db.execute(stmt).scalars())
+
+    # Generic fallback: one lookup for the whole batch, then bulk update and insert
+    existing = {
+        task_id: (response_id, sequence)
+        for task_id, response_id, sequence in db.query(
+            EvaluationResponse.task_id, EvaluationResponse.id, EvaluationResponse.sequence
+        ).filter(
+            EvaluationResponse.evaluation_id == evaluation_id,
+            EvaluationResponse.task_id.in_(list(responses))
+        ).all()
+    }
+
+    updates = []
+    inserts = []
+    for row in rows:
+        if row["task_id"] not in existing:
+            inserts.append(row)
+            continue
+        response_id, stored = existing[row["task_id"]]
+        if row["sequence"] is None or stored is None or row["sequence"] > stored:
+            updates.append({"id": response_id, "response": row["response"], "sequence": stored if row["sequence"] is None else row["sequence"]})
+
+    if updates:
+        db.bulk_update_mappings(EvaluationResponse, updates)
+    if inserts:
+        db.bulk_insert_mappings(EvaluationResponse, inserts)
+
+    id_to_task = {response_id: task_id for task_id, (response_id, _) in existing.items()}
+    return {row["task_id"] for row in inserts} | {id_to_task[update["id"]] for update in updates}
+
+
+def apply_responses(db: Session, evaluation_id: int, responses: Dict[int, ResponseEnum],
+                    sequences: Optional[Dict[int, int]] = None) -> Set[int]:
+    """
+    Upsert responses and keep any stored evaluation_scores row in step.
+    Raw counts move by +/-1 per changed item instead of being recounted; does not commit.
+    Returns the task ids written (stale sequenced writes are dropped). Raises
+    ResponseTargetNotFound, before writing anything, for an evaluation outside the session's
+    tenant or a task id the catalog doesn't know.
+    """
+    if not responses:
+        return set()
+
+    test_types = get_task_catalog(db).task_test_types
+    unknown = [task_id for task_id in responses if task_id not in test_types]
+    if unknown:
+        raise ResponseTargetNotFound(evaluation_id, unknown)
+    # Tenant sessions only see their own evaluations. The share lock lets writers run side by
+    # side but waits for a score calculation in progress, whose scores row is then read below
+    if db.query(Evaluation.id).filter(Evaluation.id == evaluation_id).with_for_update(read=True).scalar() is None:
+        raise ResponseTargetNotFound(evaluation_id)
+
+    # Lock the stored scores (if any) so concurrent writers adjust them one at a time
+    stored = db.query(EvaluationScore, Evaluation.age_years, Evaluation.age_months).join(
+        Evaluation, Evaluation.id == EvaluationScore.evaluation_id
+    ).filter(
+        EvaluationScore.evaluation_id == evaluation_id
+    ).with_for_update(of=EvaluationScore).first()
+
+    previous = {}
+    if stored:
+        previous = dict(db.query(EvaluationResponse.task_id, EvaluationResponse.response).filter(
+            EvaluationResponse.evaluation_id == evaluation_id,
+            EvaluationResponse.task_id.in_(list(responses))
+        ).all())
+
+    applied = upsert_responses(db, evaluation_id, responses, sequences)
+    if not applied:
+        return applied
+
+    if stored:
+        record, age_years, age_months = stored
+        deltas = {"listening": 0, "oral": 0}
+        for task_id in applied:
+            test_type = test_types.get(task_id)
+            if test_type in deltas:
+                deltas[test_type] += (responses[task_id] == ResponseEnum.CORRECT) - (previous.get(task_id) == ResponseEnum.CORRECT)
+        apply_raw_score_deltas(db, record, age_years, age_months, deltas["listening"], deltas["oral"])
+
+    if wants_events(db, evaluation_id):
+        totals = {
+            "listening_raw_score": record.listening_raw_score,
+            "oral_raw_score": record.oral_raw_score
+        } if stored else response_totals(db, evaluation_id)
+        publish_event(db, evaluation_id, "responses", {
+            "responses": {str(task_id): responses[task_id].value for task_id in applied},
+            "totals": totals
+        })
+
+    return applied
+
+def response_totals(db: Session, evaluation_id: int) -> Dict[str, int]:
+    """Running correct counts per test, straight from the saved responses."""
+    test_types = get_task_catalog(db).task_test_types
+
+    def correct_for(test_type: str):
+        task_ids = [task_id for task_id, name in test_types.items() if name == test_type]
+        return func.coalesce(func.sum(case((and_(
+            EvaluationResponse.task_id.in_(task_ids), EvaluationResponse.response == ResponseEnum.CORRECT
+        ), 1), else_=0)), 0)
+
+    listening, oral = db.query(correct_for("listening"), correct_for("oral")).filter(
+        EvaluationResponse.evaluation_id == evaluation_id
+    ).one()
+    return {"listening_raw_score": int(listening), "oral_raw_score": int(oral)}
@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+from fastapi import Depends
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, with_loader_criteria
+from typing import Callable, Dict, List, Optional
+
+from app.database.connection import (
+    ASYNC_DATABASE_URL, AsyncSessionLocal, async_engine, enforce_foreign_keys, get_pool_options
+)
+from app.models.models import DEFAULT_TENANT_ID, Evaluation, TenantScoped, User
+from app.services.auth_service import get_current_user
+
+logger = logging.getLogger(__name__)
+
+# Each tenant gets a pool of its own so one district's batch work can't take every connection;
+# past MAX_TENANT_POOLS, further tenants share the default pool
+TENANT_POOL_SIZE = int(os.getenv("TENANT_POOL_SIZE", "2"))
+TENANT_MAX_OVERFLOW = int(os.getenv("TENANT_MAX_OVERFLOW", "3"))
+MAX_TENANT_POOLS = int(os.getenv("MAX_TENANT_POOLS", "20"))
+
+# Evaluation tables partitioned by tenant on PostgreSQL (parents before children)
+PARTITIONED_TABLES = ("evaluations", "evaluation_responses", "evaluation_scores")
+
+class TenantRouter:
+    """Chooses the engine (and so the connection pool) that serves each tenant."""
+
+    def __init__(self):
+        self._engines: Dict[int, AsyncEngine] = {}
+        self._lock = threading.Lock()
+        self._engine_hooks: List[Callable[[int, AsyncEngine], None]] = []
+
+    def on_engine_created(self, hook: Callable[[int, AsyncEngine], None]):
+        """Run hook for every tenant engine, including those created later (e.g. metrics)."""
+        self._engine_hooks.append(hook)
+        for tenant_id, engine in list(self._engines.items()):
+            hook(tenant_id, engine)
+
+    def _create_engine(self, tenant_id: int) -> AsyncEngine:
+        options = get_pool_options(ASYNC_DATABASE_URL)
+        if "pool_size" in options:
+            options.update(pool_size=TENANT_POOL_SIZE, max_overflow=TENANT_MAX_OVERFLOW)
+        return enforce_foreign_keys(create_async_engine(ASYNC_DATABASE_URL, **options))
+
+    def engine_for(self, tenant_id: int) -> AsyncEngine:
+        engine = self._engines.get(tenant_id)
+        if engine is not None:
+            return engine
+        with self._lock:
+            engine = self._engines.get(tenant_id)
+            if engine is None:
+                if len(self._engines) >= MAX_TENANT_POOLS:
+                    return async_engine
+                engine = self._engines[tenant_id] = self._create_engine(tenant_id)
+                for hook in self._engine_hooks:
+                    hook(tenant_id, engine)
+                logger.info("Created connection pool for tenant %s", tenant_id)
+        return engine
+
+    def engines(self) -> List[AsyncEngine]:
+        return list(self._engines.values())
+
+    async def dispose(self):
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+        for engine in engines:
+            await engine.dispose()
+
+tenant_router = TenantRouter()
+
+def tenant_session(tenant_id: int) -> AsyncSession:
+    """A session on the tenant's pool that only sees, and only creates, that tenant's rows."""
+    db = AsyncSessionLocal(bind=tenant_router.engine_for(tenant_id))
+    scope_session(db.sync_session, tenant_id)
+    return db
+
+def scope_session(db: Session, tenant_id: int) -> Session:
+    """Restrict an existing (e.g. script) session to one tenant."""
+    db.info["tenant_id"] = tenant_id
+    return db
+
+def session_tenant_id(db: Session) -> Optional[int]:
+    return db.info.get("tenant_id")
+
+def evaluation_tenant_id(db: Session, evaluation_id: int) -> Optional[int]:
+    """The owning tenant of an evaluation: the session's own, or looked up for unscoped sessions."""
+    tenant_id = session_tenant_id(db)
+    if tenant_id is not None:
+        return tenant_id
+    with db.no_autoflush:
+        return db.scalar(select(Evaluation.tenant_id).where(Evaluation.id == evaluation_id))
+
+def get_tenant_id(user: Optional[User] = Depends(get_current_user)) -> int:
+    return user.tenant_id if user is not None and user.tenant_id is not None else DEFAULT_TENANT_ID
+
+async def get_tenant_db(tenant_id: int = Depends(get_tenant_id)):
+    async with tenant_session(tenant_id) as db:
+        yield db
+
+@event.listens_for(Session, "do_orm_execute")
+def add_tenant_criteria(execute_state):
+    """
+    Filter every ORM query in a tenant session on tenant_id, so PostgreSQL prunes to that
+    tenant's partitions and rows of other tenants are never visible.
+    """
+    tenant_id = execute_state.session.info.get("tenant_id")
+    if tenant_id is None or execute_state.is_column_load or execute_state.is_relationship_load:
+        return
+    if execute_state.is_select or execute_state.is_update or execute_state.is_delete:
+        execute_state.statement = execute_state.statement.options(with_loader_criteria(
+            TenantScoped, lambda cls: cls.tenant_id == tenant_id, include_aliases=True
+        ))
+
+@event.listens_for(Session, "before_flush")
+def assign_tenant(session: Session, flush_context, instances):
+    for instance in session.new:
+        if isinstance(instance, TenantScoped) and instance.tenant_id is None:
+            evaluation_id = getattr(instance, "evaluation_id", None)
+            if evaluation_id is not None:
+                instance.tenant_id = evaluation_tenant_id(session, evaluation_id)
+            else:
+                instance.tenant_id = session.info.get("tenant_id")
+
+def create_tenant_partitions(db: Session, tenant_id: int) -> List[str]:
+    """
+    Give a tenant partitions of its own (PostgreSQL only; does not commit). Rows it already
+    has in the default partition are moved across. Returns the partitions created.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return []
+    tenant_id = int(tenant_id)
+    partitions = {table: f"{table}_t{tenant_id}" for table in PARTITIONED_TABLES}
+    if all(db.scalar(select(func.to_regclass(partition))) for partition in partitions.values()):
+        return []
+
+    # The default partition may not keep rows matching a new partition's bound: park them, then
+    # re-insert once the partitions exist (children out first, parents back in first, for the FKs)
+    for table in PARTITIONED_TABLES:
+        db.execute(text(
+            f"CREATE TEMPORARY TABLE move_{table} ON COMMIT DROP AS "
+            f"SELECT * FROM {table}_default WHERE tenant_id = {tenant_id}"
+        ))
+    for table in reversed(PARTITIONED_TABLES):
+        db.execute(text(f"DELETE FROM {table}_default WHERE tenant_id = {tenant_id}"))
+    for table, partition in partitions.items():
+        db.execute(text(f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table} FOR VALUES IN ({tenant_id})"))
+    for table in PARTITIONED_TABLES:
+        db.execute(text(f"INSERT INTO {table} SELECT * FROM move_{table}"))
+    return list(partitions.values())
@@ -0,0 +1,311 @@
+"""
+Performance benchmark for the evaluation API.
+
+Seeds a synthetic dataset (task catalog, complete Table A1/A2 norms and
+thousands of evaluations with responses) into a dedicated benchmark database,
+then drives the real FastAPI app in-process, with no network, and reports
+p50/p95/p99 latency, throughput and SQL statements per request for each endpoint.
+
+    python benchmark.py                                       # SQLite file benchmark.db
+    python benchmark.py --database-url postgresql+psycopg2://localhost/slp_bench
+    python benchmark.py --save benchmarks/sqlite.json         # record a baseline
+    python benchmark.py --compare benchmarks/sqlite.json      # diff against it
+
+The schema is dropped, rebuilt through the migrations and re-seeded on every run,
+so the database name must contain "bench".
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser(description="Benchmark the SLP evaluation API in-process.")
+parser.add_argument("--database-url", default="sqlite:///benchmark.db", help="Benchmark database (its name must contain 'bench')")
+parser.add_argument("--evaluations", type=int, default=2000, help="Synthetic evaluations to seed")
+parser.add_argument("--items", type=int, default=50, help="Items per test (oral and listening)")
+parser.add_argument("--requests", type=int, default=300, help="Measured requests per endpoint")
+parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per endpoint")
+parser.add_argument("--concurrency", type=int, default=1, help="Requests in flight at once")
+parser.add_argument("--seed", type=int, default=1, help="Random seed for data and request order")
+parser.add_argument("--save", help="Write results to this JSON file")
+parser.add_argument("--compare", help="Compare against a saved JSON baseline")
+parser.add_argument("--threshold", type=float, default=20.0, help="Percent p95 slowdown counted as a regression")
+args = parser.parse_args()
+
+# The app reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = args.database_url
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from sqlalchemy.engine import make_url
+
+if "bench" not in (make_url(args.database_url).database or ""):
+    parser.error("the benchmark drops and re-creates every table; use a database whose name contains 'bench'")
+
+import httpx
+
+from app.database.connection import engine, async_engine, Base, count_statements
+from app.database.migrations import upgrade_to_head
+from app.main import app
+from app.models.models import (
+    DEFAULT_TENANT_ID, User, Category, TestType, Task, TableA1LC, TableA1OE, TableA2,
+    Evaluation, EvaluationResponse, ResponseEnum, StatusEnum
+)
+from app.services.auth_service import get_password_hash
+from app.services.tenant_service import tenant_router
+
+USERNAME = "benchmark"
+PASSWORD = "benchmark-password"
+CATEGORIES = ["Lexical/Semantic", "Syntactic", "Supralinguistic", "Pragmatic"]
+AGE_YEARS = range(3, 22)
+
+def percentile_rank(standard_score: int) -> str:
+    """Percentile of a standard score (mean 100, SD 15), formatted like the published tables."""
+    percentile = 50 * (1 + math.erf((standard_score - 100) / (15 * math.sqrt(2))))
+    if percentile < 0.1:
+        return "<0.1"
+    if percentile > 99.9:
+        return ">99.9"
+    return f"{percentile:.1f}" if percentile < 1 or percentile > 99 else str(round(percentile))
+
+def norm_rows(items: int, difficulty: float):
+    """Complete Table A1 grid: every age in years and months, every raw score from 0 to items."""
+    rows = []
+    for age_years in AGE_YEARS:
+        for age_months in range(12):
+            age = age_years + age_months / 12
+            expected = items * min(0.95, 0.15 + difficulty * (age - 3) / 18)
+            spread = max(items * 0.15, 1)
+            for raw_score in range(items + 1):
+                standard = max(40, min(160, round(100 + 15 * (raw_score - expected) / spread)))
+                rows.append({
+                    "age_years": age_years,
+                    "age_months": age_months,
+                    "raw_score": raw_score,
+                    "standard_score": standard,
+                    "percentile_rank": percentile_rank(standard)
+                })
+    return rows
+
+def composite_rows():
+    rows = []
+    for sum_standard_scores in range(80, 321):
+        composite = max(40, min(160, round(100 + (sum_standard_scores - 200) * 0.55)))
+        rows.append({
+            "sum_standard_scores": sum_standard_scores,
+            "composite_standard_score": composite,
+            "composite_percentile_rank": percentile_rank(composite)
+        })
+    return rows
+
+def reset_schema():
+    """Empty the database, then build it through the migrations (partitioned, like production)."""
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("DROP SCHEMA public CASCADE")
+            conn.exec_driver_sql("CREATE SCHEMA public")
+        else:
+            Base.metadata.drop_all(bind=conn)
+            conn.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+    upgrade_to_head()
+
+def seed(rnd: random.Random):
+    reset_schema()
+
+    # The migrations created the default tenant, which owns everything seeded here
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"username": USERNAME, "password_hash": get_password_hash(PASSWORD)}])
+        conn.execute(Category.__table__.insert(), [{"id": i + 1, "name": name} for i, name in enumerate(CATEGORIES)])
+        conn.execute(TestType.__table__.insert(), [{"id": 1, "name": "oral"}, {"id": 2, "name": "listening"}])
+        conn.execute(Task.__table__.insert(), [
+            {
+                "test_type_id": test_type_id,
+                "item": f"A{item}",
+                "category_id": rnd.randint(1, len(CATEGORIES)),
+                "task_description": f"Synthetic {'oral' if test_type_id == 1 else 'listening'} item {item}"
+            }
+            for test_type_id in (1, 2) for item in range(1, args.items + 1)
+        ])
+        conn.execute(TableA1LC.__table__.insert(), norm_rows(args.items, 0.75))
+        conn.execute(TableA1OE.__table__.insert(), norm_rows(args.items, 0.7))
+        conn.execute(TableA2.__table__.insert(), composite_rows())
+
+        started = datetime(2024, 1, 1)
+        conn.execute(Evaluation.__table__.insert(), [
+            {
+                "student_firstname": f"Student{i}",
+                "student_lastname": "Benchmark",
+                "age_years": rnd.choice(AGE_YEARS),
+                "age_months": rnd.randint(0, 11),
+                "school": f"School {i % 25}",
+                "status": StatusEnum.COMPLETED if rnd.random() < 0.7 else StatusEnum.IN_PROGRESS,
+                "created_at": started + timedelta(minutes=17 * i)
+            }
+            for i in range(args.evaluations)
+        ])
+
+        task_count = 2 * args.items
+        for first in range(1, args.evaluations + 1, 500):
+            rows = []
+            for evaluation_id in range(first, min(first + 500, args.evaluations + 1)):
+                ability = rnd.random()
+                answered = task_count if rnd.random() < 0.8 else rnd.randint(0, task_count)
+                rows.extend(
+                    {
+                        "evaluation_id": evaluation_id,
+                        "task_id": task_id,
+                        "response": ResponseEnum.CORRECT if rnd.random() < ability else ResponseEnum.INCORRECT
+                    }
+                    for task_id in range(1, answered + 1)
+                )
+            if rows:
+                conn.execute(EvaluationResponse.__table__.insert(), rows)
+
+def endpoint_requests(rnd: random.Random):
+    """Request factories per endpoint; each returns (method, url, json body)."""
+    task_count = 2 * args.items
+
+    def evaluation_id():
+        return rnd.randint(1, args.evaluations)
+
+    return {
+        "GET /dashboard": lambda: ("GET", "/api/evaluation/dashboard", None),
+        "GET /test/{id}": lambda: ("GET", f"/api/evaluation/test/{evaluation_id()}", None),
+        "POST /test/{id}/response": lambda: (
+            "POST",
+            f"/api/evaluation/test/{evaluation_id()}/response",
+            {"task_id": rnd.randint(1, task_count), "response": rnd.choice(["correct", "incorrect"])}
+        ),
+        "POST /test/{id}/calculate": lambda: ("POST", f"/api/evaluation/test/{evaluation_id()}/calculate", None),
+    }
+
+async def run_endpoint(client: httpx.AsyncClient, make_request, count: int):
+    """Issue count requests with args.concurrency in flight; returns latencies, wall time and statements."""
+    latencies = []
+    pending = [make_request() for _ in range(count)]
+    queue = iter(pending)
+
+    async def worker():
+        for method, url, body in queue:
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+
+    # Evaluation queries run on the tenant's own pool, the rest on the shared engines
+    binds = {engine, async_engine.sync_engine, tenant_router.engine_for(DEFAULT_TENANT_ID).sync_engine}
+    with ExitStack() as stack:
+        counters = [stack.enter_context(count_statements(bind)) for bind in binds]
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed, sum(counter.count for counter in counters)
+
+def summarize(latencies, elapsed: float, statements: int) -> dict:
+    milliseconds = sorted(latency * 1000 for latency in latencies)
+    cuts = statistics.quantiles(milliseconds, n=100, method="inclusive")
+    return {
+        "requests": len(milliseconds),
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "mean_ms": round(statistics.fmean(milliseconds), 3),
+        "max_ms": round(milliseconds[-1], 3),
+        "throughput_rps": round(len(milliseconds) / elapsed, 1),
+        "sql_per_request": round(statements / len(milliseconds), 2)
+    }
+
+async def run_benchmark(rnd: random.Random) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            response = await client.post("/api/auth/login", json={"username": USERNAME, "password": PASSWORD})
+            response.raise_for_status()
+            client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+            for name, make_request in endpoint_requests(rnd).items():
+                await run_endpoint(client, make_request, args.warmup)
+                latencies, elapsed, statements = await run_endpoint(client, make_request, args.requests)
+                results[name] = summarize(latencies, elapsed, statements)
+    return results
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def print_results(results: dict):
+    print(f"{'endpoint':<28}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'SQL/req':>9}")
+    for name, row in results.items():
+        print(f"{name:<28}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+              f"{row['throughput_rps']:>9.1f}{row['sql_per_request']:>9.2f}")
+
+def compare(results: dict, baseline: dict) -> bool:
+    """Print the change against a baseline; True when any endpoint regressed."""
+    def change(new, old):
+        return (new - old) / old * 100 if old else 0.0
+
+    regressed = False
+    print(f"\nAgainst {args.compare} ({baseline['meta']['commit']}, {baseline['meta']['created_at']}):")
+    print(f"{'endpoint':<28}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'SQL/req':>12}")
+    for name, row in results.items():
+        old = baseline["endpoints"].get(name)
+        if old is None:
+            print(f"{name:<28}  (not in baseline)")
+            continue
+        p95_change = change(row["p95_ms"], old["p95_ms"])
+        more_sql = row["sql_per_request"] > old["sql_per_request"]
+        flag = "  REGRESSION" if p95_change > args.threshold or more_sql else ""
+        regressed = regressed or bool(flag)
+        print(f"{name:<28}{change(row['p50_ms'], old['p50_ms']):>+8.1f}%{p95_change:>+8.1f}%"
+              f"{change(row['p99_ms'], old['p99_ms']):>+8.1f}%{change(row['throughput_rps'], old['throughput_rps']):>+8.1f}%"
+              f"{old['sql_per_request']:>6.2f}->{row['sql_per_request']:<5.2f}{flag}")
+    return regressed
+
+rnd = random.Random(args.seed)
+started = time.perf_counter()
+seed(rnd)
+print(f"Seeded {args.evaluations} evaluations x {2 * args.items} items into {engine.dialect.name} "
+      f"in {time.perf_counter() - started:.1f}s")
+
+results = asyncio.run(run_benchmark(rnd))
+print_results(results)
+
+report = {
+    "meta": {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "dialect": engine.dialect.name,
+        "evaluations": args.evaluations,
+        "items_per_test": args.items,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "python": platform.python_version()
+    },
+    "endpoints": results
+}
+
+if args.save:
+    os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+    with open(args.save, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {args.save}")
+
+if args.compare:
+    with open(args.compare) as f:
+        if compare(results, json.load(f)):
+            sys.exit(1)
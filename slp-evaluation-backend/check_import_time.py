@@ -0,0 +1,83 @@
+"""
+Regression check: importing the API must stay fast and must not load heavy optional modules.
+
+Imports app.main in fresh interpreters (no connections are made on import), takes the
+fastest of several runs, and fails if it exceeds the budget or if any module that only
+some requests need (NumPy for analytics, OpenCV/Tesseract for OCR) was loaded.
+The slowest direct imports are listed to show where the time goes.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Loaded on demand by the requests that need them, never at startup
+LAZY_MODULES = ("numpy", "cv2", "pytesseract", "PIL", "pyinstrument")
+
+MEASURE = """
+import sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(elapsed)
+print(",".join(name for name in {lazy!r} if name in sys.modules))
+"""
+
+parser = argparse.ArgumentParser(description="Check the import time of app.main against a budget.")
+parser.add_argument("--budget", type=float, default=float(os.getenv("IMPORT_BUDGET_SECONDS", "1.5")),
+                    help="Maximum seconds for the fastest import")
+parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+args = parser.parse_args()
+
+here = os.path.dirname(os.path.abspath(__file__))
+env = dict(os.environ, PYTHONPATH=here + os.pathsep + os.environ.get("PYTHONPATH", ""))
+# Engines are created lazily, so any URL will do for an import
+env.setdefault("DATABASE_URL", "sqlite:///import_check.db")
+
+timings = []
+loaded = set()
+for _ in range(args.runs):
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE.format(lazy=LAZY_MODULES)],
+        cwd=here, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        sys.exit(1)
+    elapsed, modules = result.stdout.splitlines()[-2:]
+    timings.append(float(elapsed))
+    loaded.update(filter(None, modules.split(",")))
+
+# One more run with -X importtime for the breakdown (it slows the import, so it isn't timed)
+profile = subprocess.run(
+    [sys.executable, "-X", "importtime", "-c", "import app.main"],
+    cwd=here, env=env, capture_output=True, text=True
+)
+imports = []
+for line in profile.stderr.splitlines():
+    parts = line.split("|")
+    if len(parts) == 3 and parts[1].strip().isdigit():
+        # Nesting is shown by two spaces per level; keep what app.main imports directly
+        depth = (len(parts[2]) - len(parts[2].lstrip()) - 1) // 2
+        if depth == 1:
+            imports.append((int(parts[1]), parts[2].strip()))
+
+best = min(timings)
+print(f"import app.main: best {best * 1000:.0f}ms, worst {max(timings) * 1000:.0f}ms over {args.runs} runs "
+      f"(budget {args.budget * 1000:.0f}ms)")
+print("Slowest direct imports of app.main (including their dependencies):")
+for microseconds, module in sorted(imports, reverse=True)[:args.top]:
+    print(f"  {microseconds / 1000:7.1f}ms  {module}")
+
+failed = False
+if best > args.budget:
+    print(f"FAIL: import took {best * 1000:.0f}ms, over the {args.budget * 1000:.0f}ms budget")
+    failed = True
+if loaded:
+    print(f"FAIL: loaded at import time but should be lazy: {', '.join(sorted(loaded))}")
+    failed = True
+
+if failed:
+    sys.exit(1)
+print("OK")
@@ -0,0 +1,138 @@
+"""
+Regression check: the hot lookup queries must be able to use an index.
+
+Runs EXPLAIN (EXPLAIN QUERY PLAN on SQLite) for each query against DATABASE_URL
+and fails if any checked table is read with a sequential scan. On PostgreSQL
+sequential scans are disabled for the check, so a seq scan in the plan means no
+usable index exists (small tables would otherwise be seq-scanned by choice).
+On PostgreSQL it also fails if a query of one tenant reads more than one
+partition of a table, i.e. partition pruning did not happen.
+Run `alembic upgrade head` first.
+"""
+import json
+import re
+import sys
+from datetime import datetime
+
+from sqlalchemy import event, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.database.connection import engine
+from app.models.models import (
+    DEFAULT_TENANT_ID, Evaluation, EvaluationResponse, TableA1LC, TableA1OE, TableA2, StatusEnum
+)
+from app.services.calculation_service import calculate_scores_for_evaluation
+from app.services.tenant_service import scope_session
+
+CHECKED_TABLES = {"evaluations", "evaluation_responses", "table_a1_lc", "table_a1_oe", "table_a2"}
+
+def parent_table(relation: str) -> str:
+    """Partitions are named <table>_t<tenant id> and <table>_default."""
+    return re.sub(r"_(t\d+|default)$", "", relation)
+
+def captured_scoring_queries(conn):
+    """Record the statements the scoring engine actually runs."""
+    captured = []
+
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(conn, "before_cursor_execute", before_cursor_execute)
+    try:
+        with Session(bind=conn) as db:
+            # Scoped like a request session, so the queries carry the tenant filter
+            scope_session(db, DEFAULT_TENANT_ID)
+            try:
+                calculate_scores_for_evaluation(db, 0)
+            except ValueError:
+                pass  # no evaluation 0; the query itself is what matters
+    finally:
+        event.remove(conn, "before_cursor_execute", before_cursor_execute)
+    return [(f"scoring query {i + 1}", statement, parameters) for i, (statement, parameters) in enumerate(captured)]
+
+def constructed_queries(conn):
+    tenant = DEFAULT_TENANT_ID
+    queries = {
+        "response upsert lookup": select(EvaluationResponse.id).where(
+            EvaluationResponse.tenant_id == tenant, EvaluationResponse.evaluation_id == 1, EvaluationResponse.task_id == 1
+        ),
+        "test page overlay": select(Evaluation.id, EvaluationResponse.task_id, EvaluationResponse.response).outerjoin(
+            EvaluationResponse, (EvaluationResponse.evaluation_id == Evaluation.id) & (EvaluationResponse.tenant_id == tenant)
+        ).where(Evaluation.tenant_id == tenant, Evaluation.id == 1),
+        "table A1 LC lookup": select(TableA1LC.standard_score).where(
+            TableA1LC.age_years == 7, TableA1LC.age_months == 3, TableA1LC.raw_score == 40
+        ),
+        "table A1 OE lookup": select(TableA1OE.standard_score).where(
+            TableA1OE.age_years == 7, TableA1OE.age_months == 3, TableA1OE.raw_score == 40
+        ),
+        "table A2 lookup": select(TableA2.composite_standard_score).where(TableA2.sum_standard_scores == 200),
+        "dashboard page": select(Evaluation.id, Evaluation.created_at).where(Evaluation.tenant_id == tenant).order_by(
+            Evaluation.created_at.desc(), Evaluation.id.desc()
+        ).limit(51),
+        "dashboard page by status": select(Evaluation.id).where(
+            Evaluation.tenant_id == tenant,
+            Evaluation.status == StatusEnum.COMPLETED,
+            tuple_(Evaluation.created_at, Evaluation.id) < (datetime(2030, 1, 1), 1000)
+        ).order_by(Evaluation.created_at.desc(), Evaluation.id.desc()).limit(51),
+    }
+    compiled = []
+    for name, query in queries.items():
+        statement = query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        compiled.append((name, str(statement), None))
+    return compiled
+
+def seq_scans_postgres(conn, statement, parameters):
+    cursor = conn.connection.dbapi_connection.cursor()
+    cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+    plan = cursor.fetchone()[0]
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    cursor.close()
+
+    scans = []
+    partitions = {}
+    def walk(node):
+        relation = node.get("Relation Name")
+        table = parent_table(relation) if relation else None
+        if table in CHECKED_TABLES:
+            if node.get("Node Type") == "Seq Scan":
+                scans.append(f"SEQ SCAN on {relation}")
+            if relation != table:
+                partitions.setdefault(table, set()).add(relation)
+        for child in node.get("Plans", []):
+            walk(child)
+    walk(plan[0]["Plan"])
+    unpruned = [f"{table} partitions not pruned" for table, read in partitions.items() if len(read) > 1]
+    return scans + unpruned
+
+def seq_scans_sqlite(conn, statement, parameters):
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    scans = []
+    for row in rows:
+        detail = row[-1]
+        words = detail.split()
+        if words[:1] == ["SCAN"] and "INDEX" not in detail and words[1] in CHECKED_TABLES:
+            scans.append(f"SEQ SCAN on {words[1]}")
+    return scans
+
+failures = []
+with engine.connect() as conn:
+    postgres = conn.dialect.name == "postgresql"
+    if postgres:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+    queries = captured_scoring_queries(conn) + constructed_queries(conn)
+    for name, statement, parameters in queries:
+        if postgres:
+            scans = seq_scans_postgres(conn, statement, parameters)
+        else:
+            scans = seq_scans_sqlite(conn, statement, parameters or ())
+        status = "ok" if not scans else ", ".join(scans)
+        print(f"{name:32} {status}")
+        if scans:
+            failures.append(name)
+    conn.rollback()
+
+if failures:
+    print(f"{len(failures)} queries have no usable index or read other tenants' partitions")
+    sys.exit(1)
+print("All checked queries use indexes")
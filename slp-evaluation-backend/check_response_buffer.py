@@ -0,0 +1,108 @@
+"""
+Regression check: coalesced response writes must never cross tenants, and one bad write
+must not fail the writes it was coalesced with.
+
+Two tenants write to the same evaluation id within one coalescing window. Only one of
+them owns the evaluation; the other's write must get a transaction (and tenant) of its
+own, so it cannot land in the owner's evaluation. Then the owner sends a valid write and
+one for an unknown task in the same window: only the second may fail. Runs against a
+throwaway SQLite database.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "response_buffer_check.db")
+
+from sqlalchemy import select
+
+from app.database.connection import SessionLocal
+from app.database.migrations import upgrade_to_head
+from app.models.models import (
+    DEFAULT_TENANT_ID, Category, Evaluation, EvaluationResponse, ResponseEnum, Task, TestType, Tenant
+)
+from app.services.response_buffer_service import ResponseWriteBuffer
+from app.services.response_service import ResponseTargetNotFound
+from app.services.tenant_service import tenant_router
+
+OWNER, OTHER = DEFAULT_TENANT_ID, 2
+UNKNOWN_TASK = 999
+
+def seed() -> int:
+    # The migrations create the default tenant, which owns the evaluation
+    upgrade_to_head()
+    with SessionLocal() as db:
+        db.add(Tenant(id=OTHER, name="other"))
+        category, test_type = Category(name="Check"), TestType(name="oral")
+        db.add_all([category, test_type])
+        db.flush()
+        db.add_all([
+            Task(test_type_id=test_type.id, item=f"A{item}", category_id=category.id, task_description="check")
+            for item in (1, 2)
+        ])
+        evaluation = Evaluation(
+            tenant_id=OWNER, student_firstname="Check", student_lastname="Buffer",
+            age_years=7, age_months=0, school="Check"
+        )
+        db.add(evaluation)
+        db.commit()
+        return evaluation.id
+
+async def write_from_both_tenants(evaluation_id: int):
+    buffer = ResponseWriteBuffer(window_seconds=0.05)
+    writes = [
+        asyncio.create_task(buffer.submit(OWNER, evaluation_id, {1: ResponseEnum.CORRECT})),
+        asyncio.create_task(buffer.submit(OTHER, evaluation_id, {2: ResponseEnum.CORRECT})),
+    ]
+    # Both writes are queued before either transaction starts
+    await asyncio.sleep(0)
+    batches = len(buffer._pending)
+    results = await asyncio.gather(*writes, return_exceptions=True)
+    await buffer.drain()
+    return batches, results
+
+async def write_with_unknown_task(evaluation_id: int):
+    buffer = ResponseWriteBuffer(window_seconds=0.05)
+    writes = [
+        asyncio.create_task(buffer.submit(OWNER, evaluation_id, {1: ResponseEnum.INCORRECT})),
+        asyncio.create_task(buffer.submit(OWNER, evaluation_id, {UNKNOWN_TASK: ResponseEnum.CORRECT})),
+    ]
+    await asyncio.sleep(0)
+    batches = len(buffer._pending)
+    results = await asyncio.gather(*writes, return_exceptions=True)
+    await buffer.drain()
+    return batches, results
+
+async def run_checks(evaluation_id: int):
+    try:
+        return await write_from_both_tenants(evaluation_id), await write_with_unknown_task(evaluation_id)
+    finally:
+        await tenant_router.dispose()
+
+evaluation_id = seed()
+(batches, results), (shared_batches, shared_results) = asyncio.run(run_checks(evaluation_id))
+with SessionLocal() as db:
+    owner_tasks = set(db.scalars(select(EvaluationResponse.task_id).where(
+        EvaluationResponse.tenant_id == OWNER, EvaluationResponse.evaluation_id == evaluation_id
+    )))
+
+failures = []
+if batches != 2:
+    failures.append(f"writes of two tenants shared a batch ({batches} batch for both)")
+if owner_tasks != {1}:
+    failures.append(f"owner's evaluation holds tasks {sorted(owner_tasks)}, expected only its own write [1]")
+if isinstance(results[0], BaseException):
+    failures.append(f"owner's write failed: {results[0]!r}")
+if shared_batches != 1:
+    failures.append(f"the owner's two writes did not share a batch ({shared_batches} batches)")
+if shared_results[0] != {1}:
+    failures.append(f"a valid write failed alongside an unknown task: {shared_results[0]!r}")
+if not isinstance(shared_results[1], ResponseTargetNotFound):
+    failures.append(f"the write for an unknown task did not fail: {shared_results[1]!r}")
+
+for failure in failures:
+    print(failure)
+if failures:
+    sys.exit(1)
+print("Tenants' writes to the same evaluation id were kept apart; a bad write failed alone")
@@ -0,0 +1,41 @@
+import argparse
+import sys
+import time
+
+from app.database.connection import engine
+from app.database.migrations import UnmanagedDatabase, upgrade_to_head
+from app.services.cache_service import CACHE_VERSION_CHECK_SECONDS
+from app.services.norm_import_service import import_norm_tables, NormImportError
+
+parser = argparse.ArgumentParser(description="Load OWLS-II norm tables from CSV files.")
+parser.add_argument("--lc", help="Table A1 Listening Comprehension CSV (age_years, age_months, raw_score, standard_score, percentile_rank)")
+parser.add_argument("--oe", help="Table A1 Oral Expression CSV (same columns as --lc)")
+parser.add_argument("--composite", help="Table A2 CSV (sum_standard_scores, composite_standard_score, composite_percentile_rank)")
+args = parser.parse_args()
+
+sources = {key: path for key, path in (("lc", args.lc), ("oe", args.oe), ("composite", args.composite)) if path}
+if not sources:
+    parser.error("give at least one of --lc, --oe, --composite")
+
+try:
+    upgrade_to_head()
+except UnmanagedDatabase as e:
+    print(f"Error: {e}")
+    sys.exit(1)
+
+started = time.perf_counter()
+try:
+    # One transaction for every table: either all of them are replaced or none are
+    with engine.begin() as conn:
+        counts = import_norm_tables(conn, sources)
+except NormImportError as e:
+    print(f"Import failed, nothing was changed. {e.table}:")
+    for problem in e.problems[:50]:
+        print(f"  - {problem}")
+    sys.exit(1)
+
+for key, count in counts.items():
+    print(f"Loaded {count} rows into {key}")
+print(f"Norm tables imported in {time.perf_counter() - started:.2f}s")
+print(f"Running API processes switch to the new norms within {CACHE_VERSION_CHECK_SECONDS:g}s")
+print("Stored evaluation scores still use the old norms until python rescore_evaluations.py is run")
@@ -1,9 +1,17 @@
+import sys
 from sqlalchemy.orm import sessionmaker
-from app.database.connection import engine, Base
+from app.database.connection import engine
+from app.database.migrations import UnmanagedDatabase, upgrade_to_head
 from app.models.models import User, Category, TestType, Task
 from app.services.auth_service import get_password_hash
+from app.services.cache_service import bump_cache_version
 
-Base.metadata.create_all(bind=engine)
+# The migrations also create the default tenant (and, on PostgreSQL, its partitions)
+try:
+    upgrade_to_head()
+except UnmanagedDatabase as e:
+    print(f"Error: {e}")
+    sys.exit(1)
 SessionLocal = sessionmaker(bind=engine)
 db = SessionLocal()
 
@@ -57,6 +65,8 @@ try:
     for task in sample_tasks:
         db.add(task)
     print("Added sample tasks with proper foreign key references")
+    # Running API processes reload their task catalog once this commits
+    bump_cache_version(db, "catalog")
 
     db.commit()
     print("Database structure updated successfully!")
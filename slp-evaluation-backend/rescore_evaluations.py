@@ -0,0 +1,65 @@
+import argparse
+import json
+import os
+import time
+
+from app.database.connection import SessionLocal
+from app.services.rescore_service import count_rescore_targets, rescore_chunk
+
+parser = argparse.ArgumentParser(
+    description="Re-score completed evaluations (and any with stored scores) against the current norm tables."
+)
+parser.add_argument("--chunk-size", type=int, default=2000, help="Evaluations scored and committed per batch")
+parser.add_argument("--checkpoint", default=".rescore_checkpoint.json", help="Progress file used by --resume")
+parser.add_argument("--resume", action="store_true", help="Continue after the last committed batch of an interrupted run")
+parser.add_argument("--tenant", type=int, help="Only re-score this tenant's evaluations (its partitions on PostgreSQL)")
+args = parser.parse_args()
+
+def save_checkpoint(state: dict):
+    # Write then rename so an interrupted run never leaves a truncated checkpoint
+    tmp_path = f"{args.checkpoint}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, args.checkpoint)
+
+state = {"last_evaluation_id": 0, "rescored": 0, "unscored": 0, "tenant": args.tenant}
+if args.resume:
+    if not os.path.exists(args.checkpoint):
+        parser.error(f"no checkpoint at {args.checkpoint}")
+    with open(args.checkpoint) as f:
+        state = json.load(f)
+    if state.get("tenant") != args.tenant:
+        parser.error(f"the checkpoint is for --tenant {state.get('tenant')}")
+    print(f"Resuming after evaluation {state['last_evaluation_id']} ({state['rescored']} already rescored)")
+
+db = SessionLocal()
+try:
+    remaining = count_rescore_targets(db, state["last_evaluation_id"], args.tenant)
+    print(f"{remaining} evaluations to re-score")
+
+    started = time.perf_counter()
+    done = 0
+    while True:
+        last_id, count, unscored = rescore_chunk(db, state["last_evaluation_id"], args.chunk_size, args.tenant)
+        if not count:
+            break
+        # Each batch is its own transaction; the checkpoint only moves once it is committed
+        db.commit()
+        state["last_evaluation_id"] = last_id
+        state["rescored"] += count
+        state["unscored"] += unscored
+        save_checkpoint(state)
+
+        done += count
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed else 0
+        eta = (remaining - done) / rate if rate else 0
+        print(f"  {done}/{remaining} ({done * 100 // max(remaining, 1)}%) up to id {last_id}, {rate:.0f}/s, ~{eta:.0f}s left")
+finally:
+    db.close()
+
+if os.path.exists(args.checkpoint):
+    os.remove(args.checkpoint)
+print(f"Re-scored {state['rescored']} evaluations in {time.perf_counter() - started:.2f}s")
+if state["unscored"]:
+    print(f"{state['unscored']} evaluations have no composite score (raw score or age outside the norm tables)")
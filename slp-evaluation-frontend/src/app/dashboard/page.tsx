@@ -13,12 +13,18 @@ interface Evaluation {
 
 export default function DashboardPage() {
   const [evaluations, setEvaluations] = useState<Evaluation[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState('')
   const router = useRouter()
 
-  const fetchEvaluations = async () => {
-    setLoading(true)
+  const fetchEvaluations = async (cursor: string | null = null) => {
+    if (cursor) {
+      setLoadingMore(true)
+    } else {
+      setLoading(true)
+    }
     try {
       const token = localStorage.getItem('token')
       
@@ -27,7 +33,8 @@ export default function DashboardPage() {
         return
       }
 
-      const response = await fetch('http://localhost:8000/api/evaluation/dashboard', {
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''
+      const response = await fetch(`http://localhost:8000/api/evaluation/dashboard${query}`, {
         headers: {
           'Authorization': `Bearer ${token}`,
         },
@@ -35,7 +42,8 @@ export default function DashboardPage() {
 
       if (response.ok) {
         const data = await response.json()
-        setEvaluations(data)
+        setEvaluations(prev => cursor ? [...prev, ...data] : data)
+        setNextCursor(response.headers.get('X-Next-Cursor'))
       } else if (response.status === 401) {
         localStorage.removeItem('token')
         router.push('/')
@@ -47,6 +55,7 @@ export default function DashboardPage() {
       setError('Network error loading evaluations')
     } finally {
       setLoading(false)
+      setLoadingMore(false)
     }
   }
 
@@ -170,6 +179,18 @@ export default function DashboardPage() {
             </tbody>
           </table>
         </div>
+
+        {!loading && nextCursor && (
+          <div className="mt-8 text-center">
+            <button
+              onClick={() => fetchEvaluations(nextCursor)}
+              disabled={loadingMore}
+              className="px-10 py-4 bg-indigo-600 text-white text-2xl font-bold rounded-lg hover:bg-indigo-700 shadow-lg disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load More'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   )
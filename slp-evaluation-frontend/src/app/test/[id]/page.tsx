@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useRouter, useParams } from 'next/navigation'
 
 interface Task {
@@ -60,6 +60,10 @@ export default function TestPage() {
   const router = useRouter()
   const params = useParams()
   const evaluationId = params.id
+  const statusRef = useRef<string | null>(null)
+  // Sequence of the latest click per task still being saved; live updates don't overwrite those
+  const pendingWritesRef = useRef<{[taskId: number]: number}>({})
+  const lastSequenceRef = useRef(0)
 
   const fetchTestData = async () => {
     try {
@@ -83,15 +87,23 @@ export default function TestPage() {
       if (response.ok) {
         const data = await response.json()
         setTestData(data)
+        statusRef.current = data.evaluation.status
         
-        // If test is completed, fetch scores
+        // If test is completed, fetch stored scores (recalculating only if none were saved)
         if (data.evaluation.status === 'completed') {
-          const scoresResponse = await fetch(`http://localhost:8000/api/evaluation/test/${evaluationId}/calculate`, {
-            method: 'POST',
+          let scoresResponse = await fetch(`http://localhost:8000/api/evaluation/test/${evaluationId}/scores`, {
             headers: {
               'Authorization': `Bearer ${token}`,
             },
           })
+          if (scoresResponse.status === 404) {
+            scoresResponse = await fetch(`http://localhost:8000/api/evaluation/test/${evaluationId}/calculate`, {
+              method: 'POST',
+              headers: {
+                'Authorization': `Bearer ${token}`,
+              },
+            })
+          }
           if (scoresResponse.ok) {
             const scoresData = await scoresResponse.json()
             setScores(scoresData)
@@ -113,55 +125,178 @@ export default function TestPage() {
     }
   }, [evaluationId])
 
+  const applyLiveUpdate = (responses: {[taskId: string]: string}, status?: string) => {
+    setTestData(prev => {
+      if (!prev) return prev
+
+      const update = (task: Task) =>
+        responses[task.id] !== undefined && pendingWritesRef.current[task.id] === undefined
+          ? { ...task, response: responses[task.id] }
+          : task
+      return {
+        ...prev,
+        evaluation: status ? { ...prev.evaluation, status } : prev.evaluation,
+        oral_tasks: prev.oral_tasks.map(update),
+        listening_tasks: prev.listening_tasks.map(update)
+      }
+    })
+  }
+
+  // Live updates pushed by the server (other tabs, devices, score-sheet ingestion) instead of polling.
+  // EventSource can't send the Authorization header, so the stream is read with fetch.
+  useEffect(() => {
+    if (!evaluationId) return
+    const token = localStorage.getItem('token')
+    if (!token) return
+
+    const controller = new AbortController()
+
+    const handleEvent = (type: string, data: any) => {
+      if (type === 'snapshot') {
+        // Sent on every (re)connect, so anything missed while disconnected is caught up here
+        const completedElsewhere = data.status === 'completed' && statusRef.current !== 'completed'
+        applyLiveUpdate(data.responses, data.status)
+        if (completedElsewhere) {
+          fetchTestData()
+        }
+      } else if (type === 'responses') {
+        applyLiveUpdate(data.responses)
+      } else if (type === 'scores') {
+        statusRef.current = data.status
+        setScores(data.scores)
+        applyLiveUpdate({}, data.status)
+      } else if (type === 'resync') {
+        fetchTestData()
+      }
+    }
+
+    const listen = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          const response = await fetch(`http://localhost:8000/api/evaluation/test/${evaluationId}/events`, {
+            headers: {
+              'Authorization': `Bearer ${token}`,
+            },
+            signal: controller.signal,
+          })
+          if (response.status === 401 || response.status === 404) return
+
+          if (response.ok && response.body) {
+            const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+            let buffer = ''
+            while (true) {
+              const { value, done } = await reader.read()
+              if (done) break
+              buffer += value
+
+              let boundary
+              while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary)
+                buffer = buffer.slice(boundary + 2)
+
+                let type = 'message'
+                let data = ''
+                for (const line of block.split('\n')) {
+                  if (line.startsWith('event: ')) type = line.slice(7)
+                  else if (line.startsWith('data: ')) data += line.slice(6)
+                }
+                if (data) handleEvent(type, JSON.parse(data))
+              }
+            }
+          }
+        } catch (error) {
+          if (controller.signal.aborted) return
+        }
+        // Reconnect after a pause; the new snapshot brings the page up to date
+        await new Promise(resolve => setTimeout(resolve, 3000))
+      }
+    }
+
+    listen()
+    return () => controller.abort()
+  }, [evaluationId])
+
+  const setTaskResponse = (taskId: number, response: string) => {
+    setTestData(prev => {
+      if (!prev) return prev
+      
+      return {
+        ...prev,
+        oral_tasks: prev.oral_tasks.map(task => 
+          task.id === taskId ? { ...task, response } : task
+        ),
+        listening_tasks: prev.listening_tasks.map(task => 
+          task.id === taskId ? { ...task, response } : task
+        )
+      }
+    })
+  }
+
+  // Increasing across clicks and page reloads, so the server can drop stale or repeated writes
+  const nextSequence = () => {
+    lastSequenceRef.current = Math.max(Date.now() * 1000, lastSequenceRef.current + 1)
+    return lastSequenceRef.current
+  }
+
   const handleResponseChange = async (taskId: number, response: string) => {
     // Don't allow changes if test is completed
     if (testData?.evaluation.status === 'completed') {
       return
     }
 
-    setSaving(true)
-    
     // Store old response for undo
     const task = [...(testData?.oral_tasks || []), ...(testData?.listening_tasks || [])]
       .find(t => t.id === taskId)
     if (task) {
       setUndoStack(prev => [...prev, { taskId, oldResponse: task.response }])
     }
+
+    // Show the click immediately; the server keeps whichever write carries the highest sequence
+    const sequence = nextSequence()
+    pendingWritesRef.current[taskId] = sequence
+    setTaskResponse(taskId, response)
+    setSaving(true)
     
+    let saved = false
     try {
       const token = localStorage.getItem('token')
-      const res = await fetch(`http://localhost:8000/api/evaluation/test/${evaluationId}/response`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`,
-        },
-        body: JSON.stringify({
-          task_id: taskId,
-          response: response
-        }),
-      })
-
-      if (res.ok) {
-        setTestData(prev => {
-          if (!prev) return prev
-          
-          return {
-            ...prev,
-            oral_tasks: prev.oral_tasks.map(task => 
-              task.id === taskId ? { ...task, response } : task
-            ),
-            listening_tasks: prev.listening_tasks.map(task => 
-              task.id === taskId ? { ...task, response } : task
-            )
+      // Retrying with the same sequence is safe: a write that already landed is ignored
+      for (let attempt = 0; ; attempt++) {
+        try {
+          const res = await fetch(`http://localhost:8000/api/evaluation/test/${evaluationId}/response`, {
+            method: 'POST',
+            headers: {
+              'Content-Type': 'application/json',
+              'Authorization': `Bearer ${token}`,
+            },
+            body: JSON.stringify({
+              task_id: taskId,
+              response: response,
+              sequence: sequence
+            }),
+          })
+          if (res.ok) {
+            saved = true
+          } else {
+            setError('Failed to save response')
           }
-        })
-      } else {
-        setError('Failed to save response')
+          break
+        } catch (error) {
+          if (attempt >= 2) {
+            setError('Network error saving response')
+            break
+          }
+          await new Promise(resolve => setTimeout(resolve, 500 * 2 ** attempt))
+        }
       }
-    } catch (error) {
-      setError('Network error saving response')
     } finally {
+      // Only the latest click for a task settles it; a failed save puts the old answer back
+      if (pendingWritesRef.current[taskId] === sequence) {
+        delete pendingWritesRef.current[taskId]
+        if (!saved && task) {
+          setTaskResponse(taskId, task.response)
+        }
+      }
       setSaving(false)
     }
   }
@@ -200,8 +335,8 @@ export default function TestPage() {
       if (response.ok) {
         const data = await response.json()
         setScores(data)
-        // Refresh test data to update status
-        await fetchTestData()
+        statusRef.current = 'completed'
+        applyLiveUpdate({}, 'completed')
       } else {
         const errorData = await response.json()
         setError(errorData.detail || 'Failed to calculate scores')